@@ -6,14 +6,14 @@ calibrated to realistic industry benchmarks for California auto insurance.
 """
 
 import json
-import random
+import numpy as np
+import orjson
 from datetime import datetime
 
 
 def generate_plans(insurers, vehicles, num_plans_per_insurer=10):
     """Generate insurance plans for insurers and vehicle types"""
     plans = []
-    plan_counter = 0
     
     # Premium ranges by vehicle category
     premium_ranges = {
@@ -41,54 +41,75 @@ def generate_plans(insurers, vehicles, num_plans_per_insurer=10):
     ]
     
     plan_tiers = ['Basic', 'Standard', 'Premium', 'Elite']
+    tier_multiplier = np.array([0.85, 1.0, 1.15, 1.3])
+    
+    if not insurers or not vehicles:
+        return []
+    
+    # Encode vehicle categories as integer indexes into the range tables
+    categories = list(premium_ranges)
+    premium_low, premium_high = np.array([premium_ranges[c] for c in categories]).T
+    idv_low, idv_high = np.array([idv_ranges[c] for c in categories]).T
+    vehicle_category_idx = np.array([categories.index(v['category']) for v in vehicles])
+    vehicle_strs = [
+        f"{vehicle['make']} {vehicle['model']} {vehicle.get('variant', '')}"
+        for vehicle in vehicles
+    ]
+    
+    # Pre-draw every random value for all plans in a handful of batched calls
+    rng = np.random.default_rng()
+    total = len(insurers) * num_plans_per_insurer
+    insurer_idx = np.repeat(np.arange(len(insurers)), num_plans_per_insurer)
+    vehicle_idx = rng.integers(0, len(vehicles), total)
+    category_idx = vehicle_category_idx[vehicle_idx]
+    tier_idx = rng.integers(0, len(plan_tiers), total)
+    
+    # Premium (varies by tier)
+    base_premium = rng.uniform(premium_low[category_idx], premium_high[category_idx])
+    premium = np.round(base_premium * tier_multiplier[tier_idx], 2)
+    
+    # IDV
+    idv = np.round(rng.uniform(idv_low[category_idx], idv_high[category_idx]), 2)
     
+    # Add-ons (more for higher tiers): Premium/Elite exclude the basic (empty) option
+    add_ons_high = np.where(tier_idx >= plan_tiers.index('Premium'),
+                            len(add_ons_options) - 1, len(add_ons_options))
+    add_ons_idx = rng.integers(0, add_ons_high)
+    
+    # Regions: 3 distinct codes per plan, sampled per insurer as region lists differ
+    plan_regions = []
     for insurer in insurers:
-        insurer_name = insurer['name']
-        
-        for _ in range(num_plans_per_insurer):
-            # Random vehicle
-            vehicle = random.choice(vehicles)
-            vehicle_str = f"{vehicle['make']} {vehicle['model']} {vehicle.get('variant', '')}"
-            category = vehicle['category']
-            
-            # Random tier
-            tier = random.choice(plan_tiers)
-            
-            # Premium (varies by tier)
-            base_premium = random.uniform(*premium_ranges[category])
-            tier_multiplier = {'Basic': 0.85, 'Standard': 1.0, 'Premium': 1.15, 'Elite': 1.3}
-            premium = base_premium * tier_multiplier[tier]
-            
-            # IDV
-            idv = random.uniform(*idv_ranges[category])
-            
-            # Add-ons (more for higher tiers)
-            if tier in ['Premium', 'Elite']:
-                add_ons = random.choice(add_ons_options[:-1])  # Exclude basic
-            else:
-                add_ons = random.choice(add_ons_options)
-            
-            plan = {
-                'plan_id': f'PLAN_{plan_counter:04d}',
-                'insurer_name': insurer_name,
-                'plan_name': f'{tier} {category} Coverage',
-                'vehicle_types': [vehicle_str],
-                'region_codes': random.sample(insurer['region_codes'], k=3),
-                'premium_annual': round(premium, 2),
-                'idv': round(idv, 2),
-                'add_ons': add_ons,
-                'tier': tier
-            }
-            
-            plans.append(plan)
-            plan_counter += 1
+        regions = insurer['region_codes']
+        picks = rng.random((num_plans_per_insurer, len(regions))).argsort(axis=1)[:, :3]
+        plan_regions.extend([[regions[i] for i in row] for row in picks.tolist()])
+    
+    for plan_counter, (ins_i, veh_i, cat_i, tier_i, prem, plan_idv, add_i, regions) in enumerate(zip(
+        insurer_idx.tolist(), vehicle_idx.tolist(), category_idx.tolist(), tier_idx.tolist(),
+        premium.tolist(), idv.tolist(), add_ons_idx.tolist(), plan_regions
+    )):
+        tier = plan_tiers[tier_i]
+        plans.append({
+            'plan_id': f'PLAN_{plan_counter:04d}',
+            'insurer_name': insurers[ins_i]['name'],
+            'plan_name': f'{tier} {categories[cat_i]} Coverage',
+            'vehicle_types': [vehicle_strs[veh_i]],
+            # Normalized copies for indexed equality lookups
+            'vehicle_make': vehicles[veh_i]['make'].lower(),
+            'vehicle_model': vehicles[veh_i]['model'].lower(),
+            'region_codes': regions,
+            'premium_annual': prem,
+            'idv': plan_idv,
+            'add_ons': add_ons_options[add_i],
+            'tier': tier
+        })
     
     return plans
 
 
 def generate_signals(plans):
     """Generate service quality signals for each plan"""
-    signals = []
+    if not plans:
+        return []
     
     # Insurer performance profiles (based on market reputation)
     insurer_profiles = {
@@ -98,49 +119,64 @@ def generate_signals(plans):
         'Allstate': {'service': 0.72, 'reliability': 0.77},
         'USAA': {'service': 0.90, 'reliability': 0.95}  # Highest rated
     }
-    
-    for plan in plans:
-        insurer_name = plan['insurer_name']
-        profile = insurer_profiles.get(insurer_name, {'service': 0.70, 'reliability': 0.75})
-        
-        # Generate signals with some randomness around insurer's base profile
-        
-        # Claim TAT (days): 7-45 days, lower is better
-        base_tat = 25
-        service_factor = profile['service']
-        claim_tat = int(base_tat * (1 - service_factor * 0.5) + random.uniform(-3, 3))
-        claim_tat = max(7, min(45, claim_tat))  # Clamp
-        
-        # Claim approval rate: 60-98%
-        base_approval = 78
-        approval_rate = base_approval + (service_factor * 20) + random.uniform(-5, 5)
-        approval_rate = max(60, min(98, approval_rate))
-        
-        # Customer satisfaction score: 50-100
-        base_csat = 70
-        csat_score = base_csat + (service_factor * 30) + random.uniform(-5, 5)
-        csat_score = max(50, min(100, csat_score))
-        
-        # Renewal rate: 60-95%
-        base_renewal = 75
-        renewal_rate = base_renewal + (profile['reliability'] * 20) + random.uniform(-3, 3)
-        renewal_rate = max(60, min(95, renewal_rate))
-        
-        # Complaint ratio: 0.1-1.5 (lower is better)
-        base_complaint = 0.8
-        complaint_ratio = base_complaint * (1 - profile['reliability']) + random.uniform(-0.1, 0.1)
-        complaint_ratio = max(0.1, min(1.5, complaint_ratio))
-        
-        signal = {
+    default_profile = {'service': 0.70, 'reliability': 0.75}
+    
+    # Look up each insurer's profile once, then broadcast to its plans
+    insurer_names, insurer_idx = np.unique(
+        [plan['insurer_name'] for plan in plans], return_inverse=True
+    )
+    profile_table = np.array([
+        [profile['service'], profile['reliability']]
+        for profile in (insurer_profiles.get(name, default_profile) for name in insurer_names)
+    ])
+    service_factor = profile_table[insurer_idx, 0]
+    reliability_factor = profile_table[insurer_idx, 1]
+    
+    # Draw all randomness around the insurer's base profile in one batch:
+    # columns are TAT, approval, CSAT, renewal, complaint noise amplitudes
+    rng = np.random.default_rng()
+    noise = rng.uniform(-1, 1, size=(len(plans), 5)) * np.array([3, 5, 5, 3, 0.1])
+    
+    # Claim TAT (days): 7-45 days, lower is better
+    base_tat = 25
+    claim_tat = (base_tat * (1 - service_factor * 0.5) + noise[:, 0]).astype(int)
+    claim_tat = np.clip(claim_tat, 7, 45)
+    
+    # Claim approval rate: 60-98%
+    base_approval = 78
+    approval_rate = np.clip(base_approval + service_factor * 20 + noise[:, 1], 60, 98)
+    
+    # Customer satisfaction score: 50-100
+    base_csat = 70
+    csat_score = np.clip(base_csat + service_factor * 30 + noise[:, 2], 50, 100)
+    
+    # Renewal rate: 60-95%
+    base_renewal = 75
+    renewal_rate = np.clip(base_renewal + reliability_factor * 20 + noise[:, 3], 60, 95)
+    
+    # Complaint ratio: 0.1-1.5 (lower is better)
+    base_complaint = 0.8
+    complaint_ratio = np.clip(base_complaint * (1 - reliability_factor) + noise[:, 4], 0.1, 1.5)
+    
+    # Convert back to plain Python types for JSON serialization
+    signals = [
+        {
             'plan_id': plan['plan_id'],
-            'claim_tat_days': claim_tat,
-            'claim_approval_rate_pct': round(approval_rate, 1),
-            'csat_score': round(csat_score, 1),
-            'renewal_rate_pct': round(renewal_rate, 1),
-            'complaint_ratio': round(complaint_ratio, 2)
+            'claim_tat_days': tat,
+            'claim_approval_rate_pct': approval,
+            'csat_score': csat,
+            'renewal_rate_pct': renewal,
+            'complaint_ratio': complaint
         }
-        
-        signals.append(signal)
+        for plan, tat, approval, csat, renewal, complaint in zip(
+            plans,
+            claim_tat.tolist(),
+            np.round(approval_rate, 1).tolist(),
+            np.round(csat_score, 1).tolist(),
+            np.round(renewal_rate, 1).tolist(),
+            np.round(complaint_ratio, 2).tolist()
+        )
+    ]
     
     return signals
 
@@ -166,13 +202,17 @@ def main():
     signals = generate_signals(plans)
     print(f"Generated {len(signals)} signal records")
     
+    # Embed each plan's signals so recommendations can be served without a join
+    for plan, signal in zip(plans, signals):
+        plan['signals'] = {k: v for k, v in signal.items() if k != 'plan_id'}
+    
     # Save to files
-    with open('seed_plans.json', 'w') as f:
-        json.dump(plans, f, indent=2)
+    with open('seed_plans.json', 'wb') as f:
+        f.write(orjson.dumps(plans, option=orjson.OPT_INDENT_2))
     print("Saved to seed_plans.json")
     
-    with open('seed_signals.json', 'w') as f:
-        json.dump(signals, f, indent=2)
+    with open('seed_signals.json', 'wb') as f:
+        f.write(orjson.dumps(signals, option=orjson.OPT_INDENT_2))
     print("Saved to seed_signals.json")
     
     print("\nData generation complete!")
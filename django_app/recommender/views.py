@@ -6,10 +6,16 @@ from django.shortcuts import render, redirect
 from django.conf import settings
 from django.contrib import messages
 import requests
+from requests.adapters import HTTPAdapter
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Shared HTTP session so calls to the Flask service reuse kept-alive connections
+flask_session = requests.Session()
+flask_session.mount('http://', HTTPAdapter(pool_connections=16, pool_maxsize=64))
+flask_session.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=64))
+
 
 def index(request):
     """Landing page with overview"""
@@ -71,7 +77,7 @@ def results(request):
         flask_url = f"{settings.FLASK_SERVICE_URL}/api/recommend"
         logger.info(f"Calling Flask API: {flask_url}")
         
-        response = requests.post(
+        response = flask_session.post(
             flask_url,
             json=payload,
             timeout=10
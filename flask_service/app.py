@@ -6,8 +6,17 @@ Main application entry point
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from datetime import datetime
+from pymongo import WriteConcern
+import atexit
+import hashlib
+import json
 import logging
-from bson import ObjectId
+import msgspec
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
 
 from config import Config
 from database import get_db, init_db
@@ -21,7 +30,8 @@ from models.schemas import (
     ExtractionRequest,
     ExtractedPlanData
 )
-from extraction.llm_extractor import LLMExtractor
+from extraction.llm_extractor import LLMExtractor, load_prompt_tokenizer
+from utils.json_provider import ORJSONProvider
 
 # Configure logging
 logging.basicConfig(
@@ -33,6 +43,7 @@ logger = logging.getLogger(__name__)
 # Initialize Flask app
 app = Flask(__name__)
 app.config.from_object(Config)
+app.json = ORJSONProvider(app)
 CORS(app)  # Enable CORS for Django frontend
 
 # Initialize database
@@ -43,6 +54,27 @@ except Exception as e:
     logger.error(f"Failed to initialize database: {e}")
     db = None
 
+# Shared recommender for requests using the default weights
+default_recommender = TOPSISRecommender(weights=Config.DEFAULT_WEIGHTS)
+
+# Initialize response cache (optional)
+cache = None
+if Config.CACHE_ENABLED:
+    try:
+        import redis
+        cache = redis.Redis.from_url(Config.REDIS_URL)
+        cache.ping()
+        logger.info("Redis cache initialized successfully")
+    except Exception as e:
+        logger.warning(f"Redis cache unavailable, continuing without cache: {e}")
+        cache = None
+
+# Shared extractor so its pooled HTTP connections are reused across requests
+llm_extractor = LLMExtractor(cache=cache)
+
+# Load the prompt tokenizer now so /extract never fetches it on a request
+load_prompt_tokenizer(Config.LLM_TOKENIZER_PATH)
+
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -96,11 +128,29 @@ def recommend():
         # Get weights (use custom or default)
         weights = req.weights if req.weights else Config.DEFAULT_WEIGHTS
         
+        # Serve repeat queries from cache
+        cache_key = recommendation_cache_key(req, weights)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            body, results_count = restamp_cached_response(cached, req)
+            log_query(req, results_count)
+            return json_bytes_response(body), 200
+        
         # Fetch relevant plans from database
-        plans = fetch_plans(
+        # With default weights, only the cheapest candidates can realistically
+        # rank in the top N, so let Mongo pre-filter by premium
+        candidate_limit = None
+        if weights == Config.DEFAULT_WEIGHTS:
+            candidate_limit = max(
+                Config.PREFILTER_MIN_CANDIDATES,
+                req.top_n * Config.PREFILTER_CANDIDATES_PER_RESULT
+            )
+        
+        plans, total_matched = fetch_plans(
             vehicle_make=req.vehicle_make,
             vehicle_model=req.vehicle_model,
-            region_code=req.region_code
+            region_code=req.region_code,
+            candidate_limit=candidate_limit
         )
         
         if not plans:
@@ -113,16 +163,32 @@ def recommend():
                 }
             ).dict()), 404
         
-        # Initialize TOPSIS recommender
-        recommender = TOPSISRecommender(weights=weights)
+        # Initialize TOPSIS recommender (ranking is stateless, so the
+        # default-weights instance is shared across requests)
+        if weights == Config.DEFAULT_WEIGHTS:
+            recommender = default_recommender
+        else:
+            recommender = TOPSISRecommender(weights=weights)
         
         # Rank plans
         ranked_plans = recommender.rank_plans(plans, top_n=req.top_n)
         
         # Format response with PlanScore schema
         recommendations = []
-        for plan in ranked_plans:
-            comp_scores = plan['component_scores']
+        completeness = calculate_data_completeness(ranked_plans)
+        for plan, data_completeness in zip(ranked_plans, completeness):
+            # Ranked output is trusted internal data, so Structs are built
+            # without re-validation
+            component_scores = {
+                criterion: ComponentScore(
+                    raw_value=score['raw'],
+                    normalized=score['normalized'],
+                    weight=score['weight'],
+                    contribution=score['weighted']
+                )
+                for criterion, score in plan['component_scores'].items()
+            }
+            signals = plan.get('signals', {})
             
             plan_score = PlanScore(
                 plan_id=str(plan.get('_id', plan.get('plan_id'))),
@@ -130,64 +196,44 @@ def recommend():
                 plan_name=plan.get('plan_name', 'Standard Plan'),
                 final_score=plan['final_score'],
                 rank=plan['rank'],
-                cost_score=ComponentScore(
-                    raw_value=comp_scores['cost']['raw'],
-                    normalized=comp_scores['cost']['normalized'],
-                    weight=comp_scores['cost']['weight'],
-                    contribution=comp_scores['cost']['weighted']
-                ),
-                coverage_score=ComponentScore(
-                    raw_value=comp_scores['coverage']['raw'],
-                    normalized=comp_scores['coverage']['normalized'],
-                    weight=comp_scores['coverage']['weight'],
-                    contribution=comp_scores['coverage']['weighted']
-                ),
-                service_score=ComponentScore(
-                    raw_value=comp_scores['service']['raw'],
-                    normalized=comp_scores['service']['normalized'],
-                    weight=comp_scores['service']['weight'],
-                    contribution=comp_scores['service']['weighted']
-                ),
-                reliability_score=ComponentScore(
-                    raw_value=comp_scores['reliability']['raw'],
-                    normalized=comp_scores['reliability']['normalized'],
-                    weight=comp_scores['reliability']['weight'],
-                    contribution=comp_scores['reliability']['weighted']
-                ),
+                cost_score=component_scores['cost'],
+                coverage_score=component_scores['coverage'],
+                service_score=component_scores['service'],
+                reliability_score=component_scores['reliability'],
                 premium_annual=plan.get('premium_annual', 0),
                 coverage_idv=plan.get('coverage_idv'),
-                claim_tat_days=plan.get('signals', {}).get('claim_tat_days'),
-                claim_approval_rate=plan.get('signals', {}).get('claim_approval_rate_pct'),
-                csat_score=plan.get('signals', {}).get('csat_score'),
-                renewal_rate=plan.get('signals', {}).get('renewal_rate_pct'),
-                complaint_ratio=plan.get('signals', {}).get('complaint_ratio'),
+                claim_tat_days=signals.get('claim_tat_days'),
+                claim_approval_rate=signals.get('claim_approval_rate_pct'),
+                csat_score=signals.get('csat_score'),
+                renewal_rate=signals.get('renewal_rate_pct'),
+                complaint_ratio=signals.get('complaint_ratio'),
                 rationale=recommender.generate_rationale(plan),
                 confidence=plan.get('confidence', 0.9),
-                data_completeness=calculate_data_completeness(plan)
+                data_completeness=data_completeness
             )
             recommendations.append(plan_score)
         
         # Log query for analytics
-        log_query(req, ranked_plans)
+        log_query(req, len(ranked_plans))
         
         # Build response
         response = RecommendationResponse(
-            query_info={
-                'vehicle': f"{req.vehicle_make} {req.vehicle_model}",
-                'region': req.region_code,
-                'top_n': req.top_n
-            },
+            query_info=build_query_info(req),
             weights_used=weights,
             recommendations=recommendations,
             metadata={
-                'total_plans_evaluated': len(plans),
+                'total_plans_evaluated': total_matched,  # All plans matching the query
+                'candidates_ranked': len(plans),  # After the premium pre-filter
                 'algorithm': 'TOPSIS',
                 'timestamp': datetime.now().isoformat(),
                 'version': '1.0.0'
             }
         )
         
-        return jsonify(response.dict()), 200
+        response_data = msgspec.json.encode(response)
+        cache_set(cache_key, response_data)
+        
+        return json_bytes_response(response_data), 200
         
     except ValueError as e:
         logger.error(f"Validation error: {e}")
@@ -204,7 +250,12 @@ def recommend():
         ).dict()), 500
 
 
-def fetch_plans(vehicle_make: str, vehicle_model: str, region_code: str) -> list:
+def fetch_plans(
+    vehicle_make: str,
+    vehicle_model: str,
+    region_code: str,
+    candidate_limit: Optional[int] = None
+) -> list:
     """
     Fetch insurance plans from database
     
@@ -212,100 +263,246 @@ def fetch_plans(vehicle_make: str, vehicle_model: str, region_code: str) -> list
         vehicle_make: Vehicle manufacturer
         vehicle_model: Vehicle model
         region_code: ZIP/region code
+        candidate_limit: If set, only return this many lowest-premium plans
     
     Returns:
-        List of insurance plans with signals
+        Tuple of (insurance plans with signals, number of plans matching
+        the query before candidate_limit)
     """
     if not db:
         logger.error("Database not initialized")
-        return []
+        return [], 0
     
     try:
         plans_collection = db.get_collection(Config.COLLECTION_PLANS)
-        signals_collection = db.get_collection(Config.COLLECTION_SIGNALS)
-        insurers_collection = db.get_collection(Config.COLLECTION_INSURERS)
         
         # Query plans matching vehicle and region
+        # Equality on normalized fields so the compound index can be used
         query = {
-            'vehicle_types': {
-                '$regex': f'{vehicle_make}.*{vehicle_model}',
-                '$options': 'i'
-            },
+            'vehicle_make': vehicle_make.strip().lower(),
+            'vehicle_model': vehicle_model.strip().lower(),
             'region_codes': region_code[:2]  # Match first 2 digits of ZIP
         }
         
-        plans_cursor = plans_collection.find(query)
-        plans = []
+        # Signals are embedded in each plan and insurer names come from the
+        # in-process cache, so a single aggregation fetches everything
+        pipeline = [{'$match': query}]
+        if candidate_limit:
+            pipeline += [{'$sort': {'premium_annual': 1}}, {'$limit': candidate_limit}]
         
-        for plan in plans_cursor:
-            # Fetch associated signals
-            signals = signals_collection.find_one({'plan_id': str(plan['_id'])})
-            
-            # Fetch insurer info
-            insurer = insurers_collection.find_one({'_id': ObjectId(plan['insurer_id'])})
-            
-            # Merge data
-            plan_data = {
-                '_id': str(plan['_id']),
-                'plan_id': str(plan['_id']),
-                'insurer_id': str(plan['insurer_id']),
-                'insurer_name': insurer['name'] if insurer else 'Unknown',
-                'plan_name': plan.get('plan_name', 'Standard'),
-                'premium_annual': plan.get('premium_annual', 1000),
-                'coverage_idv': plan.get('idv', 0),
-                'add_ons': plan.get('add_ons', []),
-                'signals': signals if signals else {}
-            }
-            
-            plans.append(plan_data)
+        # Carry only the fields used downstream, shaped into the merged plan format
+        pipeline.append({'$project': {
+            '_id': {'$toString': '$_id'},
+            'plan_id': {'$toString': '$_id'},
+            'insurer_id': {'$toString': '$insurer_id'},
+            'plan_name': {'$ifNull': ['$plan_name', 'Standard']},
+            'premium_annual': {'$ifNull': ['$premium_annual', 1000]},
+            'coverage_idv': {'$ifNull': ['$idv', 0]},
+            'add_ons': {'$ifNull': ['$add_ons', []]},
+            'signals': {'$ifNull': ['$signals', {'$literal': {}}]}
+        }})
+        
+        plans = list(plans_collection.aggregate(pipeline))
+        
+        insurer_names = get_insurer_names()
+        for plan in plans:
+            plan['insurer_name'] = insurer_names.get(plan['insurer_id'], 'Unknown')
+        
+        # Only a full candidate set can hide further matches; counting them
+        # is an index-only scan
+        total_matched = len(plans)
+        if candidate_limit and total_matched == candidate_limit:
+            total_matched = plans_collection.count_documents(query)
         
-        logger.info(f"Found {len(plans)} plans matching criteria")
-        return plans
+        logger.info(f"Found {total_matched} plans matching criteria ({len(plans)} candidates)")
+        return plans, total_matched
         
     except Exception as e:
         logger.error(f"Error fetching plans: {e}")
-        return []
+        return [], 0
 
 
-def calculate_data_completeness(plan: dict) -> float:
-    """Calculate data completeness score"""
-    required_fields = [
-        'premium_annual', 'coverage_idv',
-        'signals.claim_tat_days', 'signals.claim_approval_rate_pct',
-        'signals.csat_score', 'signals.renewal_rate_pct', 'signals.complaint_ratio'
-    ]
+def get_insurer_names() -> dict:
+    """
+    Get insurer ID to name mapping
     
-    present = 0
-    for field in required_fields:
-        if '.' in field:
-            parts = field.split('.')
-            value = plan.get(parts[0], {}).get(parts[1])
-        else:
-            value = plan.get(field)
-        
-        if value is not None:
-            present += 1
+    Insurers are small and rarely change, so the mapping is kept in
+    process and reloaded once it is older than INSURER_CACHE_TTL.
+    """
+    global _insurer_names, _insurer_names_loaded_at
+    
+    if time.monotonic() - _insurer_names_loaded_at > Config.INSURER_CACHE_TTL:
+        insurers = db.get_collection(Config.COLLECTION_INSURERS).find({}, projection={'name': 1})
+        _insurer_names = {str(insurer['_id']): insurer['name'] for insurer in insurers}
+        _insurer_names_loaded_at = time.monotonic()
+    
+    return _insurer_names
+
+
+_insurer_names = {}
+_insurer_names_loaded_at = float('-inf')
+
+
+def recommendation_cache_key(req: RecommendationRequest, weights: dict) -> str:
+    """Build a cache key from the parameters that determine a recommendation"""
+    key_data = json.dumps({
+        'make': req.vehicle_make.strip().lower(),
+        'model': req.vehicle_model.strip().lower(),
+        'region': req.region_code[:2],  # Same prefix the plan query matches on
+        'weights': weights,
+        'top_n': req.top_n
+    }, sort_keys=True)
+    return 'recommend:' + hashlib.blake2b(key_data.encode(), digest_size=16).hexdigest()
+
+
+def cache_get(key: str) -> Optional[bytes]:
+    """Fetch an encoded cached response, or None on miss or cache failure"""
+    if cache is None:
+        return None
     
-    return present / len(required_fields)
+    try:
+        cached = cache.get(key)
+        return cached if cached else None
+    except Exception as e:
+        logger.warning(f"Cache read failed: {e}")
+        return None
 
 
-def log_query(req: RecommendationRequest, results: list):
-    """Log query for analytics"""
+def cache_set(key: str, value: bytes):
+    """Store an encoded response in the cache with the configured TTL"""
+    if cache is None:
+        return
+    
+    try:
+        cache.setex(key, Config.CACHE_TTL, value)
+    except Exception as e:
+        logger.warning(f"Cache write failed: {e}")
+
+
+def build_query_info(req: RecommendationRequest) -> dict:
+    """Echo of the request parameters included in a recommendation response"""
+    return {
+        'vehicle': f"{req.vehicle_make} {req.vehicle_model}",
+        'region': req.region_code,
+        'top_n': req.top_n
+    }
+
+
+class _CachedResponse(msgspec.Struct):
+    """Cached response with everything but query_info left encoded"""
+    success: msgspec.Raw
+    message: msgspec.Raw
+    query_info: Dict[str, Any]
+    weights_used: msgspec.Raw
+    recommendations: List[msgspec.Raw]
+    metadata: msgspec.Raw
+
+
+def restamp_cached_response(cached: bytes, req: RecommendationRequest) -> Tuple[bytes, int]:
+    """
+    Point a cached response's query_info at the current request
+    
+    Requests sharing a cache entry can differ in region code (only its
+    2-digit prefix is queried), so the echoed parameters are replaced.
+    
+    Returns:
+        Tuple of (encoded response, number of recommendations)
+    """
+    response = msgspec.json.decode(cached, type=_CachedResponse)
+    response.query_info = build_query_info(req)
+    return msgspec.json.encode(response), len(response.recommendations)
+
+
+def json_bytes_response(body: bytes):
+    """Wrap already-encoded JSON in a Flask response"""
+    return app.response_class(body, mimetype='application/json')
+
+
+# Fields checked for data completeness, split by nesting level
+COMPLETENESS_PLAN_FIELDS = ('premium_annual', 'coverage_idv')
+COMPLETENESS_SIGNAL_FIELDS = (
+    'claim_tat_days', 'claim_approval_rate_pct',
+    'csat_score', 'renewal_rate_pct', 'complaint_ratio'
+)
+COMPLETENESS_FIELD_COUNT = len(COMPLETENESS_PLAN_FIELDS) + len(COMPLETENESS_SIGNAL_FIELDS)
+
+
+def calculate_data_completeness(plans: list) -> list:
+    """Calculate data completeness score for each plan"""
+    presence = np.array([
+        [plan.get(field) is not None for field in COMPLETENESS_PLAN_FIELDS] +
+        [(plan.get('signals') or {}).get(field) is not None for field in COMPLETENESS_SIGNAL_FIELDS]
+        for plan in plans
+    ], dtype=bool).reshape(len(plans), COMPLETENESS_FIELD_COUNT)
+    
+    return presence.mean(axis=1).tolist()
+
+
+def log_query(req: RecommendationRequest, results_count: int):
+    """Queue query for analytics logging (written in the background)"""
     if not db:
         return
     
     try:
-        logs_collection = db.get_collection(Config.COLLECTION_QUERY_LOGS)
-        logs_collection.insert_one({
+        _query_log_queue.put_nowait({
             'timestamp': datetime.now(),
             'vehicle': f"{req.vehicle_make} {req.vehicle_model}",
             'region_code': req.region_code,
             'top_n': req.top_n,
-            'results_count': len(results),
+            'results_count': results_count,
             'weights': req.weights
         })
+    except queue.Full:
+        logger.warning("Query log queue full, dropping log entry")
+
+
+def _write_query_logs(batch: list):
+    """Bulk insert a batch of query logs with unacknowledged writes"""
+    try:
+        logs_collection = db.get_collection(Config.COLLECTION_QUERY_LOGS).with_options(
+            write_concern=WriteConcern(w=0)
+        )
+        logs_collection.insert_many(batch, ordered=False)
     except Exception as e:
-        logger.warning(f"Failed to log query: {e}")
+        logger.warning(f"Failed to log {len(batch)} queries: {e}")
+
+
+def _query_log_writer():
+    """Drain the query log queue, flushing by batch size or interval"""
+    while True:
+        batch = [_query_log_queue.get()]
+        deadline = time.monotonic() + Config.QUERY_LOG_FLUSH_INTERVAL
+        
+        while len(batch) < Config.QUERY_LOG_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_query_log_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        _write_query_logs(batch)
+
+
+def _flush_query_logs():
+    """Write any queued logs before the process exits"""
+    batch = []
+    while True:
+        try:
+            batch.append(_query_log_queue.get_nowait())
+        except queue.Empty:
+            break
+    
+    if batch:
+        _write_query_logs(batch)
+
+
+_query_log_queue = queue.Queue(maxsize=Config.QUERY_LOG_QUEUE_SIZE)
+
+if db:
+    threading.Thread(target=_query_log_writer, name='query-log-writer', daemon=True).start()
+    atexit.register(_flush_query_logs)
 
 
 @app.route('/api/stats', methods=['GET'])
@@ -353,14 +550,11 @@ def extract_plan_data():
         
         logger.info(f"Extraction request: {req.source_type}")
         
-        # Initialize extractor
-        extractor = LLMExtractor()
-        
         # Extract based on source type
         if req.source_type == 'url':
-            extracted = extractor.extract_from_url(req.content, req.insurer_name)
+            extracted = llm_extractor.extract_from_url(req.content, req.insurer_name)
         else:
-            extracted = extractor.extract_from_text(req.content, req.insurer_name)
+            extracted = llm_extractor.extract_from_text(req.content, req.insurer_name)
         
         # Validate extracted data
         plan_data = ExtractedPlanData(**extracted)
@@ -20,6 +20,10 @@ class Config:
     # MongoDB settings
     MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
     MONGODB_DB_NAME = os.getenv('MONGODB_DB_NAME', 'insurance_recommender')
+    MONGODB_MAX_POOL_SIZE = int(os.getenv('MONGODB_MAX_POOL_SIZE', 100))
+    MONGODB_MIN_POOL_SIZE = int(os.getenv('MONGODB_MIN_POOL_SIZE', 0))
+    MONGODB_WRITE_CONCERN = os.getenv('MONGODB_WRITE_CONCERN', '')  # e.g. 'majority' or '1'; server default if unset
+    MONGODB_RETRY_WRITES = os.getenv('MONGODB_RETRY_WRITES', 'true').lower() == 'true'
     
     # Collections
     COLLECTION_INSURERS = 'insurers'
@@ -31,6 +35,8 @@ class Config:
     # LLM API Keys
     HUGGINGFACE_API_KEY = os.getenv('HUGGINGFACE_API_KEY', '')
     TOGETHER_AI_API_KEY = os.getenv('TOGETHER_AI_API_KEY', '')
+    LLM_MAX_INPUT_TOKENS = int(os.getenv('LLM_MAX_INPUT_TOKENS', 1200))  # Prompt context budget
+    LLM_TOKENIZER_PATH = os.getenv('LLM_TOKENIZER_PATH', '')  # Local tokenizer.json for the LLM model
     
     # JWT settings
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-change-in-production')
@@ -38,11 +44,23 @@ class Config:
     # Redis (optional)
     REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
     CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'False').lower() == 'true'
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 300))  # Seconds
+    INSURER_CACHE_TTL = int(os.getenv('INSURER_CACHE_TTL', 600))  # Seconds
+    LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', 7 * 86400))  # Seconds
+    
+    # Query logging (buffered background writes)
+    QUERY_LOG_BATCH_SIZE = int(os.getenv('QUERY_LOG_BATCH_SIZE', 100))
+    QUERY_LOG_FLUSH_INTERVAL = float(os.getenv('QUERY_LOG_FLUSH_INTERVAL', 2.0))  # Seconds
+    QUERY_LOG_QUEUE_SIZE = 10000
     
     # Recommendation settings
     DEFAULT_TOP_N = 3
     MAX_TOP_N = 10
     
+    # Premium pre-filter applied before TOPSIS when default weights are used
+    PREFILTER_MIN_CANDIDATES = 50
+    PREFILTER_CANDIDATES_PER_RESULT = 10
+    
     # TOPSIS default weights (λ₁, λ₂, λ₃, λ₄)
     DEFAULT_WEIGHTS = {
         'cost': 0.30,          # λ₁: Cost efficiency
@@ -10,20 +10,45 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def client_options_from_config() -> dict:
+    """Connection pool and write concern options from the environment"""
+    options = {
+        'maxPoolSize': Config.MONGODB_MAX_POOL_SIZE,
+        'minPoolSize': Config.MONGODB_MIN_POOL_SIZE,
+        'retryWrites': Config.MONGODB_RETRY_WRITES
+    }
+    
+    w = Config.MONGODB_WRITE_CONCERN
+    if w:
+        options['w'] = int(w) if w.isdigit() else w
+    
+    return options
+
+
 class Database:
     """MongoDB Database Handler"""
     
-    def __init__(self):
+    def __init__(self, **client_options):
+        """
+        Args:
+            **client_options: MongoClient options (maxPoolSize, minPoolSize,
+                w, retryWrites, ...) overriding the environment defaults
+        """
         self.client = None
         self.db = None
+        self.client_options = client_options
         self._connect()
     
     def _connect(self):
         """Establish MongoDB connection"""
+        options = client_options_from_config()
+        options.update(self.client_options)
+        
         try:
             self.client = MongoClient(
                 Config.MONGODB_URI,
-                serverSelectionTimeoutMS=5000
+                serverSelectionTimeoutMS=5000,
+                **options
             )
             # Test connection
             self.client.admin.command('ping')
@@ -52,6 +77,13 @@ class Database:
                 ('vehicle_types', ASCENDING)
             ])
             
+            self.db[Config.COLLECTION_PLANS].create_index([
+                ('vehicle_make', ASCENDING),
+                ('vehicle_model', ASCENDING),
+                ('region_codes', ASCENDING),
+                ('premium_annual', ASCENDING)
+            ])
+            
             # Signals collection
             self.db[Config.COLLECTION_SIGNALS].create_index([
                 ('plan_id', ASCENDING)
@@ -87,17 +119,30 @@ class Database:
 db_instance = None
 
 
-def get_db():
-    """Get database instance (singleton pattern)"""
+def get_db(**client_options):
+    """
+    Get database instance (singleton pattern)
+    
+    Args:
+        **client_options: MongoClient options, applied when the instance is
+            first created (one pool per process)
+    """
     global db_instance
     if db_instance is None:
-        db_instance = Database()
+        db_instance = Database(**client_options)
+    elif client_options and client_options != db_instance.client_options:
+        logger.warning(f"Database already connected; ignoring client options {client_options}")
     return db_instance
 
 
-def init_db():
-    """Initialize database with collections"""
-    db = get_db()
+def init_db(**client_options):
+    """
+    Initialize database with collections
+    
+    Args:
+        **client_options: MongoClient options passed to get_db
+    """
+    db = get_db(**client_options)
     
     collections = [
         Config.COLLECTION_INSURERS,
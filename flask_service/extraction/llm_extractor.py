@@ -6,13 +6,363 @@ to extract structured insurance plan data from unstructured sources.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import re
+import asyncio
+import bisect
+import hashlib
+import json
 import logging
+import orjson
+import threading
+import time
+from itertools import islice
 from typing import Dict, Optional, List
 from config import Config
 
+try:
+    import aiohttp
+except ImportError:  # Optional: concurrent batch extraction
+    aiohttp = None
+
+try:
+    import ahocorasick
+except ImportError:  # Optional: single-pass keyword matching
+    ahocorasick = None
+
+try:
+    import hyperscan
+except ImportError:  # Optional: single-pass prefilter for rule-based extraction
+    hyperscan = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # Optional: C-level HTML to text conversion
+    LexborHTMLParser = None
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:  # Optional: exact token budgets for LLM prompts
+    Tokenizer = None
+
 logger = logging.getLogger(__name__)
 
+# LLM endpoints
+LLM_MODEL = 'mistralai/Mistral-7B-Instruct-v0.2'
+HUGGINGFACE_API_URL = f'https://api-inference.huggingface.co/models/{LLM_MODEL}'
+TOGETHER_API_BASE = 'https://api.together.xyz/v1'
+TOGETHER_API_URL = f'{TOGETHER_API_BASE}/completions'
+LLM_API_HOSTS = ('https://api-inference.huggingface.co/', 'https://api.together.xyz/')
+
+# Pages are read up to this size; the rest is discarded
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+
+# Precompiled patterns for rule-based extraction and HTML cleaning
+PLAN_NAME_PATTERNS = (
+    re.compile(r'(?:Plan|Coverage|Policy):\s*([A-Z][A-Za-z\s]+)'),
+    re.compile(r'([A-Z][a-z]+\s+(?:Plan|Coverage|Policy))')
+)
+PREMIUM_PATTERNS = (
+    re.compile(r'\$?([\d,]+)\s*(?:per\s+year|annual|yearly)', re.IGNORECASE),
+    re.compile(r'(?:Premium|Cost):\s*\$?([\d,]+)', re.IGNORECASE)
+)
+IDV_PATTERNS = (
+    re.compile(r'IDV:\s*\$?([\d,]+)', re.IGNORECASE),
+    re.compile(r'Insured\s+Value:\s*\$?([\d,]+)', re.IGNORECASE)
+)
+SENTENCE_SPLIT_RE = re.compile(r'[.!?]')
+SENTENCE_RE = re.compile(r'\S.*?(?:[.!?](?=\s)|$)', re.DOTALL)
+SCRIPT_TAG_RE = re.compile(r'<script[^>]*>.*?</script>', re.DOTALL | re.IGNORECASE)
+STYLE_TAG_RE = re.compile(r'<style[^>]*>.*?</style>', re.DOTALL | re.IGNORECASE)
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+WHITESPACE_RE = re.compile(r'\s+')
+CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+
+RULE_PATTERNS = PLAN_NAME_PATTERNS + PREMIUM_PATTERNS + IDV_PATTERNS
+
+# Keywords for rule-based extraction
+INSURER_NAMES = (
+    'State Farm', 'Geico', 'Progressive', 'Allstate', 'USAA',
+    'Farmers', 'Liberty Mutual', 'Nationwide'
+)
+ADD_ON_KEYWORDS = (
+    'Zero Depreciation', 'Roadside Assistance', 'Engine Protection',
+    'Personal Accident Cover', 'NCB Protection', 'Consumables Cover'
+)
+EVIDENCE_KEYWORDS = ('premium', 'coverage', 'claim', 'deductible', 'idv')
+
+# (lowercase, display) pairs so fallback matching lowercases each text once
+INSURER_LOOKUP = tuple((name.lower(), name) for name in INSURER_NAMES)
+ADD_ON_LOOKUP = tuple((keyword.lower(), keyword) for keyword in ADD_ON_KEYWORDS)
+MAX_EVIDENCE_SENTENCES = 20  # Only the first sentences are searched for evidence
+
+JSON_DECODER = json.JSONDecoder()
+
+# Prompt context budget (characters are used when no tokenizer is available)
+MAX_PROMPT_CHARS = 2000
+PROMPT_KEYWORDS = tuple(
+    keyword.lower() for keyword in INSURER_NAMES + ADD_ON_KEYWORDS + EVIDENCE_KEYWORDS
+)
+
+
+def _build_rule_scanner():
+    """Compile all rule patterns into one Hyperscan database, if available"""
+    if hyperscan is None:
+        return None
+    
+    try:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=[pattern.pattern.encode() for pattern in RULE_PATTERNS],
+            ids=list(range(len(RULE_PATTERNS))),
+            elements=len(RULE_PATTERNS),
+            flags=[
+                hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP | hyperscan.HS_FLAG_SINGLEMATCH |
+                (hyperscan.HS_FLAG_CASELESS if pattern.flags & re.IGNORECASE else 0)
+                for pattern in RULE_PATTERNS
+            ]
+        )
+        return database
+    except Exception as e:
+        logger.warning(f"Failed to build Hyperscan database, using regex only: {e}")
+        return None
+
+
+RULE_SCANNER = _build_rule_scanner()
+
+
+def _build_keyword_automaton():
+    """Build one Aho-Corasick automaton over all extraction keywords, if available"""
+    if ahocorasick is None:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    keywords = (
+        [('insurer', name) for name in INSURER_NAMES] +
+        [('add_on', keyword) for keyword in ADD_ON_KEYWORDS] +
+        [('evidence', keyword) for keyword in EVIDENCE_KEYWORDS]
+    )
+    
+    # Keys are (kind, keyword) so a word shared between kinds keeps each entry
+    words = {}
+    for kind, keyword in keywords:
+        words.setdefault(keyword.lower(), []).append((kind, keyword))
+    for word, entries in words.items():
+        automaton.add_word(word, (len(word), entries))
+    
+    automaton.make_automaton()
+    return automaton
+
+
+KEYWORD_AUTOMATON = _build_keyword_automaton()
+_rule_scanner_lock = threading.Lock()
+
+
+def scan_rule_patterns(text: str) -> Optional[set]:
+    """
+    Find which rule patterns occur in text with a single Hyperscan pass
+    
+    Returns:
+        Set of matching compiled patterns, or None if Hyperscan is unavailable
+    """
+    if RULE_SCANNER is None:
+        return None
+    
+    matched = set()
+    
+    def on_match(pattern_id, start, end, flags, context):
+        matched.add(RULE_PATTERNS[pattern_id])
+    
+    try:
+        # Scratch space is per-database, so scans must not run concurrently
+        with _rule_scanner_lock:
+            RULE_SCANNER.scan(text.encode('utf-8', errors='replace'), match_event_handler=on_match)
+    except Exception as e:
+        logger.warning(f"Hyperscan scan failed, using regex only: {e}")
+        return None
+    
+    return matched
+
+
+def scan_keywords(text: str) -> Optional[Dict]:
+    """
+    Find every extraction keyword in text with a single Aho-Corasick pass
+    
+    Returns:
+        Dict with the 'insurer' and 'add_on' keywords found and the sorted
+        start offsets of 'evidence' keywords, or None if unavailable
+    """
+    if KEYWORD_AUTOMATON is None:
+        return None
+    
+    text_lower = text.lower()
+    if len(text_lower) != len(text):
+        # Offsets would not line up with the original text
+        return None
+    
+    hits = {'insurer': set(), 'add_on': set(), 'evidence': []}
+    for end, (length, entries) in KEYWORD_AUTOMATON.iter(text_lower):
+        for kind, keyword in entries:
+            if kind == 'evidence':
+                hits['evidence'].append(end - length + 1)
+            else:
+                hits[kind].add(keyword)
+    
+    hits['evidence'].sort()
+    return hits
+
+
+def candidate_patterns(patterns: tuple, matched: Optional[set]) -> tuple:
+    """Limit patterns to those the prefilter saw (all of them without one)"""
+    if matched is None:
+        return patterns
+    return tuple(pattern for pattern in patterns if pattern in matched)
+
+
+_prompt_tokenizer = None
+
+
+def load_prompt_tokenizer(path: str):
+    """
+    Load the LLM's tokenizer from a local tokenizer.json at startup
+    
+    Never downloads: with no path configured (or tokenizers not installed)
+    prompts keep using the character budget.
+    
+    Args:
+        path: Path to the tokenizer.json file (empty to skip)
+    
+    Returns:
+        Loaded tokenizer, or None
+    """
+    global _prompt_tokenizer
+    
+    if not path:
+        logger.info("No prompt tokenizer configured, using character budget")
+        return None
+    if Tokenizer is None:
+        logger.warning("tokenizers not installed, using character budget")
+        return None
+    
+    try:
+        _prompt_tokenizer = Tokenizer.from_file(path)
+        logger.info(f"Loaded prompt tokenizer from {path}")
+    except Exception as e:
+        logger.warning(f"Tokenizer unavailable, using character budget: {e}")
+    
+    return _prompt_tokenizer
+
+
+def get_prompt_tokenizer():
+    """Tokenizer loaded by load_prompt_tokenizer, or None"""
+    return _prompt_tokenizer
+
+
+def select_prompt_context(text: str, max_tokens: int) -> str:
+    """
+    Pick the most keyword-dense sentences of text that fit the prompt budget
+    
+    Sentences are ranked by insurance keyword count and taken greedily until
+    the budget (max_tokens, or MAX_PROMPT_CHARS without a tokenizer) is used
+    up, then re-joined in their original order.
+    
+    Returns:
+        Context string for the extraction prompt
+    """
+    sentences = [match.group().strip() for match in SENTENCE_RE.finditer(text)]
+    sentences = [sentence for sentence in sentences if sentence]
+    if not sentences:
+        return text[:MAX_PROMPT_CHARS]
+    
+    tokenizer = get_prompt_tokenizer()
+    if tokenizer is not None:
+        budget = max_tokens
+        encodings = tokenizer.encode_batch(sentences, add_special_tokens=False)
+        costs = [len(encoding.ids) for encoding in encodings]
+    else:
+        budget = MAX_PROMPT_CHARS
+        costs = [len(sentence) + 1 for sentence in sentences]
+    
+    if sum(costs) <= budget:
+        return ' '.join(sentences)
+    
+    def keyword_count(index):
+        sentence = sentences[index].lower()
+        return sum(sentence.count(keyword) for keyword in PROMPT_KEYWORDS)
+    
+    ranked = sorted(range(len(sentences)), key=keyword_count, reverse=True)
+    
+    selected = []
+    used = 0
+    for index in ranked:
+        if used + costs[index] <= budget:
+            selected.append(index)
+            used += costs[index]
+    
+    if not selected:
+        # A single sentence exceeds the budget: truncate the best one
+        best = ranked[0]
+        if tokenizer is not None:
+            return sentences[best][:encodings[best].offsets[budget - 1][1]]
+        return sentences[best][:budget]
+    
+    selected.sort()
+    return ' '.join(sentences[index] for index in selected)
+
+
+def iter_sentences(text: str, limit: int):
+    """
+    Yield the first `limit` pieces of SENTENCE_SPLIT_RE.split(text)
+    
+    Terminators are searched for lazily, so only the scanned prefix of a
+    long text is touched and no list of every sentence is built.
+    """
+    start = 0
+    count = 0
+    for match in SENTENCE_SPLIT_RE.finditer(text):
+        if count >= limit:
+            return
+        yield text[start:match.start()]
+        start = match.end()
+        count += 1
+    
+    if count < limit:
+        yield text[start:]
+
+
+def page_encoding(content_type: str) -> str:
+    """
+    Charset for decoding a fetched page, shared by the sync and async paths
+    
+    Uses the Content-Type charset when present, otherwise UTF-8 (rather than
+    the ISO-8859-1 default requests applies to text/* responses).
+    """
+    match = CHARSET_RE.search(content_type)
+    return match.group(1) if match else 'utf-8'
+
+
+def find_json_object(text: str) -> Optional[Dict]:
+    """
+    Decode the first JSON object embedded in text
+    
+    Probes each '{' in turn with raw_decode, so nested objects and trailing
+    text after the object are handled without regex backtracking.
+    
+    Returns:
+        Decoded object, or None if text contains no valid JSON object
+    """
+    start = text.find('{')
+    while start >= 0:
+        try:
+            obj, _ = JSON_DECODER.raw_decode(text, start)
+            if isinstance(obj, dict):
+                return obj
+        except json.JSONDecodeError:
+            pass
+        start = text.find('{', start + 1)
+    return None
+
 
 class LLMExtractor:
     """
@@ -24,9 +374,62 @@ class LLMExtractor:
     - Local text parsing (fallback)
     """
     
-    def __init__(self):
+    def __init__(self, cache=None):
+        """
+        Initialize extractor
+        
+        Args:
+            cache: Optional Redis client used to cache LLM responses
+        """
         self.hf_api_key = Config.HUGGINGFACE_API_KEY
         self.together_api_key = Config.TOGETHER_AI_API_KEY
+        self.cache = cache
+        
+        # Pooled keep-alive session shared by page fetches and LLM API calls.
+        # Only idempotent methods are retried on server errors
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Completion POSTs are billed and not idempotent: a 5xx or read timeout
+        # may come after the provider accepted the request, so the API hosts
+        # only retry rate limiting (429) and failed connects
+        api_adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                read=0,
+                backoff_factor=0.3,
+                status_forcelist=[429],
+                allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {'POST'},
+                respect_retry_after_header=True
+            )
+        )
+        for api_host in LLM_API_HOSTS:
+            self.session.mount(api_host, api_adapter)
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Insurance Recommender Bot)'
+        })
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Release pooled HTTP connections"""
+        self.session.close()
     
     def extract_from_text(self, text: str, insurer_hint: Optional[str] = None) -> Dict:
         """
@@ -72,14 +475,15 @@ class LLMExtractor:
         logger.info(f"Extracting insurance data from URL: {url}")
         
         try:
-            # Fetch webpage content
-            response = requests.get(url, timeout=10, headers={
-                'User-Agent': 'Mozilla/5.0 (Insurance Recommender Bot)'
-            })
-            response.raise_for_status()
+            # Fetch webpage content, bounded to MAX_PAGE_BYTES
+            with self.session.get(url, stream=True, timeout=10) as response:
+                response.raise_for_status()
+                body = response.raw.read(MAX_PAGE_BYTES + 1, decode_content=True)
+                encoding = page_encoding(response.headers.get('Content-Type', ''))
+            html = self._decode_page(body, encoding, url)
             
             # Extract text from HTML (simple approach)
-            text = self._clean_html(response.text)
+            text = self._clean_html(html)
             
             # Extract using text method
             result = self.extract_from_text(text, insurer_hint)
@@ -89,21 +493,237 @@ class LLMExtractor:
             
         except Exception as e:
             logger.error(f"Failed to extract from URL: {e}")
-            return {
-                'error': str(e),
-                'insurer_name': insurer_hint or 'Unknown',
-                'extraction_confidence': 0.0
-            }
+            return self._failed_extraction(e, insurer_hint)
+    
+    async def extract_from_urls(self, urls: List[str], insurer_hint: Optional[str] = None) -> List[Dict]:
+        """
+        Extract insurance plan data from several URLs concurrently
+        
+        Page fetches and LLM calls for all URLs overlap on one event loop,
+        so wall time tracks the slowest URL rather than the sum of all.
+        Sync callers can use asyncio.run(extractor.extract_from_urls(urls)).
+        
+        Args:
+            urls: Website URLs to extract from
+            insurer_hint: Optional insurer name hint applied to every URL
+        
+        Returns:
+            Extracted plan data dictionaries, in the same order as urls
+        """
+        async with self._async_session() as session:
+            results = await asyncio.gather(
+                *(self._async_extract_from_url(session, url, insurer_hint) for url in urls),
+                return_exceptions=True
+            )
+        
+        return [
+            self._failed_extraction(result, insurer_hint) if isinstance(result, Exception) else result
+            for result in results
+        ]
+    
+    async def extract_from_text_batch(
+        self,
+        texts: List[str],
+        insurer_hints: Optional[List[Optional[str]]] = None
+    ) -> List[Dict]:
+        """
+        Extract insurance plan data from several texts concurrently
+        
+        Args:
+            texts: Raw text contents
+            insurer_hints: Optional insurer name hint per text
+        
+        Returns:
+            Extracted plan data dictionaries, in the same order as texts
+        """
+        hints = insurer_hints or [None] * len(texts)
+        
+        async with self._async_session() as session:
+            results = await asyncio.gather(
+                *(self._async_extract_from_text(session, text, hint) for text, hint in zip(texts, hints)),
+                return_exceptions=True
+            )
+        
+        return [
+            self._failed_extraction(result, hint) if isinstance(result, Exception) else result
+            for result, hint in zip(results, hints)
+        ]
+    
+    def _decode_page(self, body: bytes, encoding: str, url: str) -> str:
+        """Decode a fetched page, truncating it to MAX_PAGE_BYTES"""
+        if len(body) > MAX_PAGE_BYTES:
+            logger.warning(f"Page larger than {MAX_PAGE_BYTES} bytes, truncating: {url}")
+            body = body[:MAX_PAGE_BYTES]
+        
+        try:
+            return body.decode(encoding, errors='replace')
+        except LookupError:
+            # Unknown charset label in the response headers
+            return body.decode('utf-8', errors='replace')
+    
+    def _failed_extraction(self, error: Exception, insurer_hint: Optional[str]) -> Dict:
+        """Result returned when extraction could not be performed"""
+        return {
+            'error': str(error),
+            'insurer_name': insurer_hint or 'Unknown',
+            'extraction_confidence': 0.0
+        }
+    
+    def _async_session(self):
+        """
+        Create an aiohttp session for one batch
+        
+        aiohttp sessions are bound to the running event loop, so each batch
+        gets its own pooled session rather than one held on the extractor.
+        """
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is required for batch extraction")
+        
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, limit_per_host=8, keepalive_timeout=60),
+            headers={'User-Agent': self.session.headers['User-Agent']}
+        )
+    
+    async def _async_extract_from_url(self, session, url: str, insurer_hint: Optional[str]) -> Dict:
+        """Async counterpart of extract_from_url"""
+        logger.info(f"Extracting insurance data from URL: {url}")
+        
+        try:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                response.raise_for_status()
+                body = await self._async_read_page(response)
+                encoding = page_encoding(response.headers.get('Content-Type', ''))
+            html = self._decode_page(body, encoding, url)
+            
+            result = await self._async_extract_from_text(session, self._clean_html(html), insurer_hint)
+            result['source_url'] = url
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"Failed to extract from URL: {e}")
+            return self._failed_extraction(e, insurer_hint)
+    
+    async def _async_read_page(self, response) -> bytes:
+        """
+        Read up to MAX_PAGE_BYTES + 1 bytes of a response body
+        
+        StreamReader.read(n) returns only what is already buffered, so chunks
+        are collected until the limit or EOF.
+        """
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > MAX_PAGE_BYTES:
+                break
+        return b''.join(chunks)[:MAX_PAGE_BYTES + 1]
+    
+    async def _async_extract_from_text(self, session, text: str, insurer_hint: Optional[str]) -> Dict:
+        """Async counterpart of extract_from_text"""
+        if self.hf_api_key:
+            try:
+                headers, payload = self._huggingface_request(text, insurer_hint)
+                result = await self._async_cached_post_json(session, HUGGINGFACE_API_URL, headers, payload)
+                return self._parse_huggingface_result(result, insurer_hint)
+            except Exception as e:
+                logger.warning(f"Hugging Face extraction failed: {e}")
+        
+        if self.together_api_key:
+            try:
+                headers, payload = self._together_request(text, insurer_hint)
+                result = await self._async_cached_post_json(session, TOGETHER_API_URL, headers, payload)
+                return self._parse_together_result(result, insurer_hint)
+            except Exception as e:
+                logger.warning(f"Together AI extraction failed: {e}")
+        
+        return self._extract_with_rules(text, insurer_hint)
+    
+    async def _async_cached_post_json(self, session, api_url: str, headers: Dict, payload: Dict):
+        """Async counterpart of _cached_post_json"""
+        key = self._llm_cache_key(api_url, payload)
+        # The Redis client is synchronous, so keep its round trips off the loop
+        cached = await asyncio.to_thread(self._cache_get, key)
+        if cached is not None:
+            return cached
+        
+        async with session.post(
+            api_url,
+            data=orjson.dumps(payload),
+            headers={**headers, 'Content-Type': 'application/json'},
+            timeout=aiohttp.ClientTimeout(total=30)
+        ) as response:
+            response.raise_for_status()
+            result = orjson.loads(await response.read())
+        
+        await asyncio.to_thread(self._cache_set, key, result)
+        return result
+    
+    def _cached_post_json(self, api_url: str, headers: Dict, payload: Dict):
+        """
+        POST a JSON payload to an LLM API, serving repeats from the cache
+        
+        Prompts are near-deterministic (low temperature, fixed model), so an
+        identical payload sent to the same endpoint reuses the stored response.
+        """
+        key = self._llm_cache_key(api_url, payload)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        response = self.session.post(
+            api_url,
+            headers={**headers, 'Content-Type': 'application/json'},
+            data=orjson.dumps(payload),
+            timeout=30
+        )
+        response.raise_for_status()
+        result = orjson.loads(response.content)
+        
+        self._cache_set(key, result)
+        return result
+    
+    def _llm_cache_key(self, api_url: str, payload: Dict) -> str:
+        """Content-addressed cache key for an LLM request"""
+        key_data = orjson.dumps([api_url, payload], option=orjson.OPT_SORT_KEYS)
+        return 'llm:' + hashlib.sha256(key_data).hexdigest()
+    
+    def _cache_get(self, key: str):
+        """Fetch a cached LLM response, or None on miss or cache failure"""
+        if self.cache is None:
+            return None
+        
+        try:
+            cached = self.cache.get(key)
+            return orjson.loads(cached) if cached else None
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+    
+    def _cache_set(self, key: str, value):
+        """Store an LLM response in the cache"""
+        if self.cache is None:
+            return
+        
+        try:
+            self.cache.setex(key, Config.LLM_CACHE_TTL, orjson.dumps(value))
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
     
     def _extract_with_huggingface(self, text: str, insurer_hint: Optional[str]) -> Dict:
         """Extract using Hugging Face Inference API"""
+        headers, payload = self._huggingface_request(text, insurer_hint)
+        result = self._cached_post_json(HUGGINGFACE_API_URL, headers, payload)
+        
+        return self._parse_huggingface_result(result, insurer_hint)
+    
+    def _huggingface_request(self, text: str, insurer_hint: Optional[str]):
+        """Build headers and payload for a Hugging Face Inference API call"""
         
         # Create extraction prompt
         prompt = self._build_extraction_prompt(text, insurer_hint)
         
-        # Call Hugging Face API (using a suitable model)
-        api_url = "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct-v0.2"
-        
         headers = {"Authorization": f"Bearer {self.hf_api_key}"}
         payload = {
             "inputs": prompt,
@@ -114,12 +734,10 @@ class LLMExtractor:
             }
         }
         
-        response = requests.post(api_url, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-        
-        result = response.json()
-        
-        # Parse LLM output
+        return headers, payload
+    
+    def _parse_huggingface_result(self, result, insurer_hint: Optional[str]) -> Dict:
+        """Parse a Hugging Face Inference API response"""
         if isinstance(result, list) and len(result) > 0:
             generated_text = result[0].get('generated_text', '')
             return self._parse_llm_output(generated_text, insurer_hint)
@@ -128,10 +746,15 @@ class LLMExtractor:
     
     def _extract_with_together(self, text: str, insurer_hint: Optional[str]) -> Dict:
         """Extract using Together AI API"""
+        headers, payload = self._together_request(text, insurer_hint)
+        result = self._cached_post_json(TOGETHER_API_URL, headers, payload)
         
-        prompt = self._build_extraction_prompt(text, insurer_hint)
+        return self._parse_together_result(result, insurer_hint)
+    
+    def _together_request(self, text: str, insurer_hint: Optional[str]):
+        """Build headers and payload for a Together AI completions call"""
         
-        api_url = "https://api.together.xyz/v1/completions"
+        prompt = self._build_extraction_prompt(text, insurer_hint)
         
         headers = {
             "Authorization": f"Bearer {self.together_api_key}",
@@ -139,19 +762,114 @@ class LLMExtractor:
         }
         
         payload = {
-            "model": "mistralai/Mistral-7B-Instruct-v0.2",
+            "model": LLM_MODEL,
             "prompt": prompt,
             "max_tokens": 500,
             "temperature": 0.3
         }
         
-        response = requests.post(api_url, headers=headers, json=payload, timeout=30)
+        return headers, payload
+    
+    def _parse_together_result(self, result, insurer_hint: Optional[str]) -> Dict:
+        """Parse a Together AI completions response"""
+        generated_text = result['choices'][0]['text']
+        return self._parse_llm_output(generated_text, insurer_hint)
+    
+    def extract_batch_together(
+        self,
+        texts: List[str],
+        insurer_hints: Optional[List[Optional[str]]] = None,
+        poll_interval: float = 30,
+        timeout: float = 24 * 3600
+    ) -> List[Dict]:
+        """
+        Extract many texts through Together AI's Batch API
+        
+        Batch jobs are billed at a discount and processed asynchronously
+        server-side, which suits bulk, non-interactive ingestion. Use
+        extract_from_text for interactive requests.
+        
+        Args:
+            texts: Raw text contents
+            insurer_hints: Optional insurer name hint per text
+            poll_interval: Seconds between batch status checks
+            timeout: Maximum seconds to wait for the batch to finish
+        
+        Returns:
+            Extracted plan data dictionaries, in the same order as texts.
+            Items the batch could not process use rule-based extraction.
+        """
+        if not self.together_api_key:
+            raise ValueError("TOGETHER_AI_API_KEY is required for batch extraction")
+        
+        hints = insurer_hints or [None] * len(texts)
+        auth = {"Authorization": f"Bearer {self.together_api_key}"}
+        
+        # One request line per text, keyed by its position
+        lines = []
+        for i, (text, hint) in enumerate(zip(texts, hints)):
+            _, payload = self._together_request(text, hint)
+            lines.append(orjson.dumps({"custom_id": str(i), "body": payload}))
+        
+        # Upload the JSONL input and start the batch
+        response = self.session.post(
+            f"{TOGETHER_API_BASE}/files",
+            headers=auth,
+            files={'file': ('extraction_batch.jsonl', b'\n'.join(lines))},
+            data={'purpose': 'batch-api'},
+            timeout=60
+        )
         response.raise_for_status()
+        file_id = response.json()['id']
         
-        result = response.json()
-        generated_text = result['choices'][0]['text']
+        response = self.session.post(
+            f"{TOGETHER_API_BASE}/batches",
+            headers=auth,
+            json={"input_file_id": file_id, "endpoint": "/v1/completions"},
+            timeout=30
+        )
+        response.raise_for_status()
+        batch = response.json()
+        batch = batch.get('job', batch)
+        logger.info(f"Submitted Together AI batch {batch['id']} with {len(texts)} requests")
         
-        return self._parse_llm_output(generated_text, insurer_hint)
+        # Poll until the batch finishes
+        deadline = time.monotonic() + timeout
+        while batch['status'].upper() not in ('COMPLETED', 'FAILED', 'EXPIRED', 'CANCELLED'):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Together AI batch {batch['id']} did not finish in {timeout}s")
+            time.sleep(poll_interval)
+            response = self.session.get(f"{TOGETHER_API_BASE}/batches/{batch['id']}", headers=auth, timeout=30)
+            response.raise_for_status()
+            batch = response.json()
+        
+        if batch['status'].upper() != 'COMPLETED':
+            raise RuntimeError(f"Together AI batch {batch['id']} ended with status {batch['status']}")
+        
+        # Download and parse the results
+        response = self.session.get(
+            f"{TOGETHER_API_BASE}/files/{batch['output_file_id']}/content",
+            headers=auth,
+            timeout=60
+        )
+        response.raise_for_status()
+        
+        outputs = {}
+        for line in response.content.splitlines():
+            if line.strip():
+                record = orjson.loads(line)
+                outputs[record['custom_id']] = record
+        
+        results = []
+        for i, (text, hint) in enumerate(zip(texts, hints)):
+            try:
+                body = outputs[str(i)]['response']['body']
+                results.append(self._parse_together_result(body, hint))
+            except (KeyError, IndexError, TypeError) as e:
+                logger.warning(f"No batch result for item {i}, using rule-based extraction: {e}")
+                results.append(self._extract_with_rules(text, hint))
+        
+        return results
     
     def _extract_with_rules(self, text: str, insurer_hint: Optional[str]) -> Dict:
         """
@@ -159,13 +877,18 @@ class LLMExtractor:
         
         This is a simple baseline that looks for common patterns in insurance text
         """
+        # One pass each to find which patterns and keywords occur;
+        # None means the helpers search the text themselves
+        matched = scan_rule_patterns(text)
+        keyword_hits = scan_keywords(text)
+        
         extracted = {
-            'insurer_name': insurer_hint or self._extract_insurer(text),
-            'plan_name': self._extract_plan_name(text),
-            'premium_annual': self._extract_premium(text),
-            'idv': self._extract_idv(text),
-            'add_ons': self._extract_add_ons(text),
-            'evidence_snippets': self._extract_evidence(text),
+            'insurer_name': insurer_hint or self._extract_insurer(text, keyword_hits),
+            'plan_name': self._extract_plan_name(text, matched),
+            'premium_annual': self._extract_premium(text, matched),
+            'idv': self._extract_idv(text, matched),
+            'add_ons': self._extract_add_ons(text, keyword_hits),
+            'evidence_snippets': self._extract_evidence(text, keyword_hits),
             'extraction_confidence': 0.6  # Lower confidence for rule-based
         }
         
@@ -174,10 +897,12 @@ class LLMExtractor:
     def _build_extraction_prompt(self, text: str, insurer_hint: Optional[str]) -> str:
         """Build prompt for LLM extraction"""
         
+        context = select_prompt_context(text, Config.LLM_MAX_INPUT_TOKENS)
+        
         prompt = f"""Extract insurance plan details from the following text. Return a structured JSON response.
 
 Text:
-{text[:2000]}  
+{context}  
 
 Extract these fields:
 - insurer_name: Name of insurance company
@@ -199,60 +924,45 @@ Return ONLY valid JSON, no additional text.
     def _parse_llm_output(self, text: str, insurer_hint: Optional[str]) -> Dict:
         """Parse LLM output and extract structured data"""
         
-        import json
-        
-        try:
-            # Try to parse as JSON
-            # Look for JSON block in text
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                data = json.loads(json_match.group())
-                data['extraction_confidence'] = 0.85
-                return data
-        except:
-            pass
+        # Look for a JSON object in the generated text
+        data = find_json_object(text)
+        if data is not None:
+            data['extraction_confidence'] = 0.85
+            return data
         
         # Fallback: parse text manually
         return self._extract_with_rules(text, insurer_hint)
     
     # Helper methods for rule-based extraction
     
-    def _extract_insurer(self, text: str) -> str:
+    def _extract_insurer(self, text: str, keyword_hits: Optional[Dict] = None) -> str:
         """Extract insurer name"""
-        # Common insurer names
-        insurers = ['State Farm', 'Geico', 'Progressive', 'Allstate', 'USAA', 
-                   'Farmers', 'Liberty Mutual', 'Nationwide']
+        if keyword_hits is not None:
+            for insurer in INSURER_NAMES:
+                if insurer in keyword_hits['insurer']:
+                    return insurer
+            return 'Unknown'
         
         text_lower = text.lower()
-        for insurer in insurers:
-            if insurer.lower() in text_lower:
+        for insurer_lower, insurer in INSURER_LOOKUP:
+            if insurer_lower in text_lower:
                 return insurer
         
         return 'Unknown'
     
-    def _extract_plan_name(self, text: str) -> str:
+    def _extract_plan_name(self, text: str, matched: Optional[set] = None) -> str:
         """Extract plan name"""
-        patterns = [
-            r'(?:Plan|Coverage|Policy):\s*([A-Z][A-Za-z\s]+)',
-            r'([A-Z][a-z]+\s+(?:Plan|Coverage|Policy))'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
+        for pattern in candidate_patterns(PLAN_NAME_PATTERNS, matched):
+            match = pattern.search(text)
             if match:
                 return match.group(1).strip()
         
         return 'Standard Plan'
     
-    def _extract_premium(self, text: str) -> Optional[float]:
+    def _extract_premium(self, text: str, matched: Optional[set] = None) -> Optional[float]:
         """Extract annual premium"""
-        patterns = [
-            r'\$?([\d,]+)\s*(?:per\s+year|annual|yearly)',
-            r'(?:Premium|Cost):\s*\$?([\d,]+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in candidate_patterns(PREMIUM_PATTERNS, matched):
+            match = pattern.search(text)
             if match:
                 try:
                     return float(match.group(1).replace(',', ''))
@@ -261,15 +971,10 @@ Return ONLY valid JSON, no additional text.
         
         return None
     
-    def _extract_idv(self, text: str) -> Optional[float]:
+    def _extract_idv(self, text: str, matched: Optional[set] = None) -> Optional[float]:
         """Extract IDV (Insured Declared Value)"""
-        patterns = [
-            r'IDV:\s*\$?([\d,]+)',
-            r'Insured\s+Value:\s*\$?([\d,]+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in candidate_patterns(IDV_PATTERNS, matched):
+            match = pattern.search(text)
             if match:
                 try:
                     return float(match.group(1).replace(',', ''))
@@ -278,49 +983,77 @@ Return ONLY valid JSON, no additional text.
         
         return None
     
-    def _extract_add_ons(self, text: str) -> List[str]:
+    def _extract_add_ons(self, text: str, keyword_hits: Optional[Dict] = None) -> List[str]:
         """Extract add-on coverages"""
-        add_ons = []
-        
-        keywords = [
-            'Zero Depreciation', 'Roadside Assistance', 'Engine Protection',
-            'Personal Accident Cover', 'NCB Protection', 'Consumables Cover'
-        ]
+        if keyword_hits is not None:
+            return [keyword for keyword in ADD_ON_KEYWORDS if keyword in keyword_hits['add_on']]
         
         text_lower = text.lower()
-        for keyword in keywords:
-            if keyword.lower() in text_lower:
-                add_ons.append(keyword)
-        
-        return add_ons
+        return [keyword for keyword_lower, keyword in ADD_ON_LOOKUP if keyword_lower in text_lower]
     
-    def _extract_evidence(self, text: str) -> List[str]:
+    def _extract_evidence(self, text: str, keyword_hits: Optional[Dict] = None) -> List[str]:
         """Extract relevant evidence snippets"""
+        if keyword_hits is not None:
+            return self._evidence_from_hits(text, keyword_hits['evidence'])
+        
         # Extract sentences containing key insurance terms
-        sentences = re.split(r'[.!?]', text)
         evidence = []
         
-        keywords = ['premium', 'coverage', 'claim', 'deductible', 'idv']
-        
-        for sentence in sentences[:20]:  # Limit to first 20 sentences
-            if any(kw in sentence.lower() for kw in keywords):
+        for sentence in iter_sentences(text, MAX_EVIDENCE_SENTENCES):
+            sentence_lower = sentence.lower()
+            if any(kw in sentence_lower for kw in EVIDENCE_KEYWORDS):
                 evidence.append(sentence.strip())
                 if len(evidence) >= 3:
                     break
         
         return evidence
     
+    def _evidence_from_hits(self, text: str, positions: List[int]) -> List[str]:
+        """Map evidence keyword offsets to their sentences"""
+        # Terminator offsets bounding the first MAX_EVIDENCE_SENTENCES sentences
+        bounds = [m.start() for m in islice(SENTENCE_SPLIT_RE.finditer(text), MAX_EVIDENCE_SENTENCES)]
+        
+        sentence_ids = []
+        for position in positions:
+            sentence_id = bisect.bisect_left(bounds, position)
+            if sentence_id >= MAX_EVIDENCE_SENTENCES:
+                break
+            if not sentence_ids or sentence_ids[-1] != sentence_id:
+                sentence_ids.append(sentence_id)
+                if len(sentence_ids) >= 3:
+                    break
+        
+        return [
+            text[bounds[i - 1] + 1 if i else 0:bounds[i] if i < len(bounds) else len(text)].strip()
+            for i in sentence_ids
+        ]
+    
     def _clean_html(self, html: str) -> str:
+        """Extract visible text from HTML"""
+        if LexborHTMLParser is not None:
+            try:
+                # Single DOM traversal in C; also decodes entities correctly
+                tree = LexborHTMLParser(html)
+                tree.strip_tags(['script', 'style'])
+                if tree.body is not None:
+                    text = tree.body.text(separator=' ', strip=True)
+                    return WHITESPACE_RE.sub(' ', text).strip()
+            except Exception as e:
+                logger.warning(f"HTML parsing failed, using regex cleaning: {e}")
+        
+        return self._clean_html_regex(html)
+    
+    def _clean_html_regex(self, html: str) -> str:
         """Simple HTML cleaning to extract text"""
         # Remove script and style tags
-        html = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
-        html = re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL | re.IGNORECASE)
+        html = SCRIPT_TAG_RE.sub('', html)
+        html = STYLE_TAG_RE.sub('', html)
         
         # Remove HTML tags
-        text = re.sub(r'<[^>]+>', ' ', html)
+        text = HTML_TAG_RE.sub(' ', html)
         
         # Clean whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = WHITESPACE_RE.sub(' ', text)
         
         return text.strip()
 
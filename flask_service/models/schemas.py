@@ -1,10 +1,14 @@
 """
-Pydantic schemas for request/response validation
+Pydantic schemas for request/response validation, plus msgspec Structs
+for the recommendation response
 """
 
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List, Dict, Any
+from typing import Annotated, Optional, List, Dict, Any
 from datetime import datetime
+import msgspec
+
+UnitFloat = Annotated[float, msgspec.Meta(ge=0, le=1)]
 
 
 class RecommendationRequest(BaseModel):
@@ -44,15 +48,19 @@ class RecommendationRequest(BaseModel):
         return v
 
 
-class ComponentScore(BaseModel):
+# Response schemas on the recommendation hot path are msgspec Structs:
+# they are built from trusted ranking output and encoded straight to JSON,
+# so they skip validation and use a compact slotted layout.
+
+class ComponentScore(msgspec.Struct, kw_only=True, gc=False):
     """Individual criterion score"""
-    raw_value: Optional[float] = Field(None, description="Original value")
-    normalized: float = Field(..., description="Normalized score (0-1)")
-    weight: float = Field(..., description="Weight applied")
-    contribution: float = Field(..., description="Weighted contribution to final score")
+    raw_value: Optional[float] = None  # Original value
+    normalized: float  # Normalized score (0-1)
+    weight: float  # Weight applied
+    contribution: float  # Weighted contribution to final score
 
 
-class PlanScore(BaseModel):
+class PlanScore(msgspec.Struct, kw_only=True, gc=False):
     """Scored insurance plan"""
     
     plan_id: str
@@ -60,8 +68,8 @@ class PlanScore(BaseModel):
     plan_name: str
     
     # Overall score
-    final_score: float = Field(..., ge=0, le=1, description="Final composite score")
-    rank: int = Field(..., ge=1, description="Ranking position")
+    final_score: UnitFloat  # Final composite score
+    rank: Annotated[int, msgspec.Meta(ge=1)]  # Ranking position
     
     # Component scores
     cost_score: ComponentScore
@@ -79,26 +87,24 @@ class PlanScore(BaseModel):
     complaint_ratio: Optional[float] = None
     
     # Explainability
-    rationale: str = Field(..., description="Human-readable explanation")
-    confidence: float = Field(default=1.0, ge=0, le=1, description="Confidence score")
-    data_completeness: float = Field(default=1.0, ge=0, le=1, description="Data quality indicator")
+    rationale: str  # Human-readable explanation
+    confidence: UnitFloat = 1.0  # Confidence score
+    data_completeness: UnitFloat = 1.0  # Data quality indicator
 
 
-class RecommendationResponse(BaseModel):
+class RecommendationResponse(msgspec.Struct, kw_only=True):
     """Response schema for recommendations"""
     
     success: bool = True
     message: str = "Recommendations generated successfully"
     
-    query_info: Dict[str, Any] = Field(..., description="Query parameters used")
-    weights_used: Dict[str, float] = Field(..., description="Final weights applied")
+    query_info: Dict[str, Any]  # Query parameters used
+    weights_used: Dict[str, float]  # Final weights applied
     
     recommendations: List[PlanScore]
     
-    metadata: Dict[str, Any] = Field(
-        default_factory=dict,
-        description="Additional metadata (timestamp, version, etc.)"
-    )
+    # Additional metadata (timestamp, version, etc.)
+    metadata: Dict[str, Any] = msgspec.field(default_factory=dict)
 
 
 class ExtractionRequest(BaseModel):
@@ -8,12 +8,115 @@ References:
 """
 
 import numpy as np
-import pandas as pd
 from typing import List, Dict, Tuple
 import logging
 
+# Optional: compiled kernel for large plan sets
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 logger = logging.getLogger(__name__)
 
+# Decision matrix column order
+CRITERIA = ('cost', 'coverage', 'service', 'reliability')
+
+# Use the compiled kernel above this many plans (below it, dispatch
+# overhead outweighs the NumPy temporaries)
+NUMBA_MIN_PLANS = 64
+
+
+def _column_norms(matrix: np.ndarray) -> np.ndarray:
+    """Vector-normalization divisors per column (all-zero columns map to 1)"""
+    norms = np.sqrt((matrix * matrix).sum(axis=0))
+    norms[norms == 0] = 1
+    return norms
+
+
+def _topsis_score(matrix: np.ndarray, weights: np.ndarray, norms: np.ndarray = None) -> np.ndarray:
+    """
+    Fused TOPSIS kernel: normalize, weight, ideal/anti-ideal, distances and
+    relative closeness in one pass without keeping per-step arrays around
+    
+    Args:
+        matrix: Raw decision matrix of shape (n_plans, n_criteria)
+        weights: Criterion weights in CRITERIA order
+        norms: Precomputed column norms (computed if omitted)
+    
+    Returns:
+        Relative closeness scores (0 to 1, higher is better)
+    """
+    if norms is None:
+        norms = _column_norms(matrix)
+    
+    weighted = matrix * (weights / norms)
+    
+    diff = weighted - weighted.max(axis=0)
+    dist_ideal = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+    np.subtract(weighted, weighted.min(axis=0), out=diff)
+    dist_anti_ideal = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+    
+    denominator = dist_ideal + dist_anti_ideal
+    return np.where(denominator > 0, dist_anti_ideal, 0.0) / np.where(denominator > 0, denominator, 1.0)
+
+
+def _topsis_loop(matrix: np.ndarray, weights: np.ndarray, norms: np.ndarray) -> np.ndarray:
+    """
+    Loop form of _topsis_score, written for numba compilation
+    
+    Args:
+        matrix: Raw decision matrix of shape (n_plans, n_criteria)
+        weights: Criterion weights in CRITERIA order
+        norms: Column norms from _column_norms
+    
+    Returns:
+        Relative closeness scores (0 to 1, higher is better)
+    """
+    n, k = matrix.shape
+    scale = np.empty(k)
+    for j in range(k):
+        scale[j] = weights[j] / norms[j]
+    
+    weighted = np.empty((n, k))
+    for i in range(n):
+        for j in range(k):
+            weighted[i, j] = matrix[i, j] * scale[j]
+    
+    # Seeded from the first row rather than +/-inf sentinels, which are
+    # not safe to compare against under fastmath
+    ideal = weighted[0].copy()
+    anti_ideal = weighted[0].copy()
+    for i in range(1, n):
+        for j in range(k):
+            v = weighted[i, j]
+            if v > ideal[j]:
+                ideal[j] = v
+            if v < anti_ideal[j]:
+                anti_ideal[j] = v
+    
+    scores = np.empty(n)
+    for i in range(n):
+        d_i = 0.0
+        d_a = 0.0
+        for j in range(k):
+            d_i += (weighted[i, j] - ideal[j]) ** 2
+            d_a += (weighted[i, j] - anti_ideal[j]) ** 2
+        d_i = np.sqrt(d_i)
+        d_a = np.sqrt(d_a)
+        scores[i] = d_a / (d_i + d_a) if d_i + d_a > 0 else 0.0
+    return scores
+
+
+# fastmath without 'ninf'/'nnan', so comparisons keep IEEE semantics
+NUMBA_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+# Compiled eagerly for float64 inputs, at import (app startup) rather than
+# on the first large request, where it would stall every gevent greenlet
+NUMBA_SIGNATURE = 'float64[:](float64[:, :], float64[:], float64[:])'
+
+_topsis_njit = njit(NUMBA_SIGNATURE, cache=True, fastmath=NUMBA_FASTMATH)(_topsis_loop) if njit else None
+
 
 class TOPSISRecommender:
     """
@@ -49,7 +152,11 @@ class TOPSISRecommender:
         if not (0.99 <= total <= 1.01):
             raise ValueError(f"Weights must sum to 1.0, got {total}")
     
-    def prepare_decision_matrix(self, plans: List[Dict]) -> Tuple[pd.DataFrame, List[str]]:
+    def _weight_vector(self) -> np.ndarray:
+        """Criterion weights as an array in CRITERIA order"""
+        return np.array([self.weights[criterion] for criterion in CRITERIA], dtype=np.float64)
+    
+    def prepare_decision_matrix(self, plans: List[Dict]) -> Tuple[np.ndarray, List[str]]:
         """
         Prepare decision matrix from insurance plans
         
@@ -57,50 +164,47 @@ class TOPSISRecommender:
             plans: List of insurance plan dictionaries with signals
         
         Returns:
-            Tuple of (decision_matrix, plan_ids)
+            Tuple of (decision_matrix, plan_ids) where decision_matrix has
+            shape (n_plans, n_criteria) with columns in CRITERIA order
         """
         if not plans:
             raise ValueError("No plans provided for scoring")
         
-        matrix_data = []
-        plan_ids = []
+        n = len(plans)
+        cost = np.empty(n, dtype=np.float64)
+        coverage = np.empty(n, dtype=np.float64)
+        service = np.empty(n, dtype=np.float64)
+        reliability = np.empty(n, dtype=np.float64)
+        plan_ids = [None] * n
         
-        for plan in plans:
+        for i, plan in enumerate(plans):
             signals = plan.get('signals', {})
             
             # Extract criteria values
             # Cost: lower is better (invert for maximization)
             premium = plan.get('premium_annual', 0)
-            cost_value = 1 / premium if premium > 0 else 0
+            cost[i] = 1 / premium if premium > 0 else 0
             
             # Coverage: higher IDV is better
-            coverage_value = plan.get('coverage_idv', 0)
+            coverage[i] = plan.get('coverage_idv', 0)
             
             # Service: composite of claim speed and approval rate
             claim_tat = signals.get('claim_tat_days', 30)
             claim_speed = 1 / claim_tat if claim_tat > 0 else 0
             approval_rate = signals.get('claim_approval_rate_pct', 50) / 100
             csat = signals.get('csat_score', 50) / 100
-            service_value = (claim_speed * 0.4 + approval_rate * 0.3 + csat * 0.3)
+            service[i] = (claim_speed * 0.4 + approval_rate * 0.3 + csat * 0.3)
             
             # Reliability: renewal rate minus complaint ratio
             renewal_rate = signals.get('renewal_rate_pct', 50) / 100
             complaint_ratio = signals.get('complaint_ratio', 0.5)
-            reliability_value = renewal_rate * (1 - complaint_ratio)
+            reliability[i] = renewal_rate * (1 - complaint_ratio)
             
-            matrix_data.append({
-                'cost': cost_value,
-                'coverage': coverage_value,
-                'service': service_value,
-                'reliability': reliability_value
-            })
-            
-            plan_ids.append(plan.get('_id', plan.get('plan_id')))
+            plan_ids[i] = plan.get('_id', plan.get('plan_id'))
         
-        df = pd.DataFrame(matrix_data)
-        return df, plan_ids
+        return np.column_stack((cost, coverage, service, reliability)), plan_ids
     
-    def normalize_matrix(self, matrix: pd.DataFrame) -> pd.DataFrame:
+    def normalize_matrix(self, matrix: np.ndarray) -> np.ndarray:
         """
         Normalize decision matrix using vector normalization
         
@@ -110,18 +214,9 @@ class TOPSISRecommender:
         Returns:
             Normalized matrix
         """
-        normalized = matrix.copy()
-        
-        for col in matrix.columns:
-            col_sum_sq = np.sqrt((matrix[col] ** 2).sum())
-            if col_sum_sq > 0:
-                normalized[col] = matrix[col] / col_sum_sq
-            else:
-                normalized[col] = 0
-        
-        return normalized
+        return matrix / _column_norms(matrix)
     
-    def apply_weights(self, normalized_matrix: pd.DataFrame) -> pd.DataFrame:
+    def apply_weights(self, normalized_matrix: np.ndarray) -> np.ndarray:
         """
         Apply criterion weights to normalized matrix
         
@@ -131,15 +226,9 @@ class TOPSISRecommender:
         Returns:
             Weighted matrix
         """
-        weighted = normalized_matrix.copy()
-        
-        for criterion, weight in self.weights.items():
-            if criterion in weighted.columns:
-                weighted[criterion] = normalized_matrix[criterion] * weight
-        
-        return weighted
+        return normalized_matrix * self._weight_vector()
     
-    def calculate_ideal_solutions(self, weighted_matrix: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+    def calculate_ideal_solutions(self, weighted_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
         Calculate ideal (best) and anti-ideal (worst) solutions
         
@@ -152,16 +241,13 @@ class TOPSISRecommender:
             Tuple of (ideal_solution, anti_ideal_solution)
         """
         # For all criteria, max is ideal (we inverted cost earlier)
-        ideal = weighted_matrix.max()
-        anti_ideal = weighted_matrix.min()
-        
-        return ideal, anti_ideal
+        return weighted_matrix.max(axis=0), weighted_matrix.min(axis=0)
     
     def calculate_distances(
         self,
-        weighted_matrix: pd.DataFrame,
-        ideal: pd.Series,
-        anti_ideal: pd.Series
+        weighted_matrix: np.ndarray,
+        ideal: np.ndarray,
+        anti_ideal: np.ndarray
     ) -> Tuple[np.ndarray, np.ndarray]:
         """
         Calculate Euclidean distances to ideal and anti-ideal solutions
@@ -174,10 +260,10 @@ class TOPSISRecommender:
         Returns:
             Tuple of (distances_to_ideal, distances_to_anti_ideal)
         """
-        dist_ideal = np.sqrt(((weighted_matrix - ideal) ** 2).sum(axis=1))
-        dist_anti_ideal = np.sqrt(((weighted_matrix - anti_ideal) ** 2).sum(axis=1))
+        dist_ideal = np.linalg.norm(weighted_matrix - ideal, axis=1)
+        dist_anti_ideal = np.linalg.norm(weighted_matrix - anti_ideal, axis=1)
         
-        return dist_ideal.values, dist_anti_ideal.values
+        return dist_ideal, dist_anti_ideal
     
     def calculate_relative_closeness(
         self,
@@ -200,7 +286,7 @@ class TOPSISRecommender:
         # Avoid division by zero
         scores = np.where(
             denominator > 0,
-            dist_anti_ideal / denominator,
+            dist_anti_ideal / np.where(denominator > 0, denominator, 1),
             0
         )
         return scores
@@ -223,25 +309,22 @@ class TOPSISRecommender:
         # Step 1: Prepare decision matrix
         matrix, plan_ids = self.prepare_decision_matrix(plans)
         
-        # Step 2: Normalize matrix
-        normalized = self.normalize_matrix(matrix)
-        
-        # Step 3: Apply weights
-        weighted = self.apply_weights(normalized)
-        
-        # Step 4: Calculate ideal solutions
-        ideal, anti_ideal = self.calculate_ideal_solutions(weighted)
-        
-        # Step 5: Calculate distances
-        dist_ideal, dist_anti_ideal = self.calculate_distances(
-            weighted, ideal, anti_ideal
-        )
-        
-        # Step 6: Calculate relative closeness (final scores)
-        scores = self.calculate_relative_closeness(dist_ideal, dist_anti_ideal)
+        # Steps 2-6: Normalize, weight, ideal solutions, distances and
+        # relative closeness in a single fused kernel
+        weights = self._weight_vector()
+        norms = _column_norms(matrix)
+        if _topsis_njit is not None and len(plans) > NUMBA_MIN_PLANS:
+            scores = _topsis_njit(matrix, weights, norms)
+        else:
+            scores = _topsis_score(matrix, weights, norms)
         
         # Step 7: Rank and prepare results
-        ranked_indices = np.argsort(scores)[::-1]  # Descending order
+        if top_n < len(scores):
+            # Partial selection of the top_n, then sort only those
+            top = np.argpartition(-scores, top_n)[:top_n]
+            ranked_indices = top[np.argsort(-scores[top], kind='stable')]
+        else:
+            ranked_indices = np.argsort(scores)[::-1]  # Descending order
         
         results = []
         for rank, idx in enumerate(ranked_indices[:top_n], start=1):
@@ -250,31 +333,22 @@ class TOPSISRecommender:
             plan['rank'] = rank
             
             # Add component scores for explainability
+            raw_row = matrix[idx]
+            normalized_row = raw_row / norms
+            weighted_row = normalized_row * weights
             plan['component_scores'] = {
-                'cost': {
-                    'raw': float(matrix.iloc[idx]['cost']),
-                    'normalized': float(normalized.iloc[idx]['cost']),
-                    'weighted': float(weighted.iloc[idx]['cost']),
-                    'weight': self.weights['cost']
-                },
-                'coverage': {
-                    'raw': float(matrix.iloc[idx]['coverage']),
-                    'normalized': float(normalized.iloc[idx]['coverage']),
-                    'weighted': float(weighted.iloc[idx]['coverage']),
-                    'weight': self.weights['coverage']
-                },
-                'service': {
-                    'raw': float(matrix.iloc[idx]['service']),
-                    'normalized': float(normalized.iloc[idx]['service']),
-                    'weighted': float(weighted.iloc[idx]['service']),
-                    'weight': self.weights['service']
-                },
-                'reliability': {
-                    'raw': float(matrix.iloc[idx]['reliability']),
-                    'normalized': float(normalized.iloc[idx]['reliability']),
-                    'weighted': float(weighted.iloc[idx]['reliability']),
-                    'weight': self.weights['reliability']
+                criterion: {
+                    'raw': raw,
+                    'normalized': normalized,
+                    'weighted': weighted_value,
+                    'weight': self.weights[criterion]
                 }
+                for criterion, raw, normalized, weighted_value in zip(
+                    CRITERIA,
+                    raw_row.tolist(),
+                    normalized_row.tolist(),
+                    weighted_row.tolist()
+                )
             }
             
             results.append(plan)
@@ -0,0 +1,232 @@
+"""
+LLM extractor tests
+"""
+
+import asyncio
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from extraction import llm_extractor
+from extraction.llm_extractor import LLMExtractor
+
+CHUNKED_PAGE = (
+    b'<html><body><p>' + b'Lorem ipsum dolor sit amet. ' * 24000
+    + b'</p><p>Premium: $1,234 per year.</p></body></html>'
+)
+
+
+class ChunkedPageHandler(BaseHTTPRequestHandler):
+    """Serves CHUNKED_PAGE with chunked transfer encoding"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for start in range(0, len(CHUNKED_PAGE), 8192):
+            chunk = CHUNKED_PAGE[start:start + 8192]
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            self.wfile.flush()
+        self.wfile.write(b'0\r\n\r\n')
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def page_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ChunkedPageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def extractor():
+    extractor = LLMExtractor()
+    extractor.hf_api_key = ''
+    extractor.together_api_key = ''  # Rule-based extraction only
+    yield extractor
+    extractor.close()
+
+
+@pytest.mark.skipif(llm_extractor.aiohttp is None, reason="aiohttp not installed")
+def test_async_url_extraction_reads_whole_chunked_page(page_url, extractor):
+    """Chunked pages are read past the first buffered chunk, like the sync path"""
+    assert len(CHUNKED_PAGE) < llm_extractor.MAX_PAGE_BYTES
+
+    [result] = asyncio.run(extractor.extract_from_urls([page_url]))
+
+    assert result['premium_annual'] == 1234
+    assert result['premium_annual'] == extractor.extract_from_url(page_url)['premium_annual']
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Here is the extracted data: {"premium_annual": 1200}', {'premium_annual': 1200}),
+    ('{"plan": {"name": "Gold", "add_ons": [{"name": "Roadside"}]}}', {'plan': {'name': 'Gold', 'add_ons': [{'name': 'Roadside'}]}}),
+    ('{"idv": 500000} Let me know if you need anything else.', {'idv': 500000}),
+    ('{"insurer_name": "Geico"}\n{"insurer_name": "Allstate"}', {'insurer_name': 'Geico'}),
+    ('Fields {premium, idv} follow: {"premium_annual": 900}', {'premium_annual': 900}),
+])
+def test_find_json_object(text, expected):
+    """The first valid JSON object is returned, wherever it sits in the text"""
+    assert llm_extractor.find_json_object(text) == expected
+
+
+@pytest.mark.parametrize('text', ['', 'No structured data was found.', '{broken', '["not", "an", "object"]'])
+def test_find_json_object_without_object(text):
+    """Text without a decodable JSON object yields None"""
+    assert llm_extractor.find_json_object(text) is None
+
+
+FILLER_SENTENCE = 'The weather in the city was pleasant all week long.'
+KEYWORD_SENTENCES = (
+    'Geico offers Roadside Assistance with every premium plan.',
+    'The annual premium covers a deductible and claim support.',
+    'Coverage includes Zero Depreciation and Engine Protection.',
+)
+
+
+def context_text(filler_count=60):
+    """Keyword sentences spread through a long run of filler sentences"""
+    sentences = [FILLER_SENTENCE] * filler_count
+    for offset, sentence in enumerate(KEYWORD_SENTENCES):
+        sentences.insert(offset * filler_count // 3 + 5, sentence)
+    return ' '.join(sentences)
+
+
+@pytest.fixture
+def prompt_tokenizer(monkeypatch):
+    """Reset the module tokenizer so each test loads its own"""
+    monkeypatch.setattr(llm_extractor, '_prompt_tokenizer', None)
+    return llm_extractor.load_prompt_tokenizer
+
+
+@pytest.fixture
+def tokenizer_file(tmp_path):
+    """Whitespace word-level tokenizer.json covering the test vocabulary"""
+    tokenizers = pytest.importorskip('tokenizers')
+    words = set(' '.join((FILLER_SENTENCE,) + KEYWORD_SENTENCES).replace('.', ' . ').split())
+    vocab = {word: index for index, word in enumerate(['[UNK]'] + sorted(words))}
+    tokenizer = tokenizers.Tokenizer(tokenizers.models.WordLevel(vocab, unk_token='[UNK]'))
+    tokenizer.pre_tokenizer = tokenizers.pre_tokenizers.WhitespaceSplit()
+    path = tmp_path / 'tokenizer.json'
+    tokenizer.save(str(path))
+    return str(path)
+
+
+def test_load_prompt_tokenizer_without_path(prompt_tokenizer):
+    """No configured path means no tokenizer (and no download)"""
+    assert prompt_tokenizer('') is None
+    assert llm_extractor.get_prompt_tokenizer() is None
+
+
+def test_load_prompt_tokenizer_missing_file(prompt_tokenizer, tmp_path):
+    assert prompt_tokenizer(str(tmp_path / 'missing.json')) is None
+
+
+def test_select_prompt_context_short_text_unchanged(prompt_tokenizer):
+    prompt_tokenizer('')
+    text = ' '.join(KEYWORD_SENTENCES)
+    assert llm_extractor.select_prompt_context(text, 1000) == text
+
+
+def test_select_prompt_context_character_budget(prompt_tokenizer):
+    """Without a tokenizer, keyword sentences win and keep their order"""
+    prompt_tokenizer('')
+    text = context_text()
+    assert len(text) > llm_extractor.MAX_PROMPT_CHARS
+
+    context = llm_extractor.select_prompt_context(text, 1000)
+
+    assert len(context) <= llm_extractor.MAX_PROMPT_CHARS
+    positions = [context.index(sentence) for sentence in KEYWORD_SENTENCES]
+    assert positions == sorted(positions)
+
+
+def test_select_prompt_context_truncates_single_long_sentence(prompt_tokenizer):
+    prompt_tokenizer('')
+    text = 'premium ' * 1000
+    assert len(llm_extractor.select_prompt_context(text, 1000)) <= llm_extractor.MAX_PROMPT_CHARS
+
+
+def test_select_prompt_context_token_budget(prompt_tokenizer, tokenizer_file):
+    """With a tokenizer file, the budget is counted in tokens"""
+    tokenizer = prompt_tokenizer(tokenizer_file)
+    assert tokenizer is not None
+    budget = 40
+
+    context = llm_extractor.select_prompt_context(context_text(), budget)
+
+    assert len(tokenizer.encode(context, add_special_tokens=False).ids) <= budget
+    positions = [context.index(sentence) for sentence in KEYWORD_SENTENCES]
+    assert positions == sorted(positions)
+
+
+def test_select_prompt_context_token_budget_truncates(prompt_tokenizer, tokenizer_file):
+    tokenizer = prompt_tokenizer(tokenizer_file)
+    context = llm_extractor.select_prompt_context(context_text(), 5)
+
+    assert 0 < len(tokenizer.encode(context, add_special_tokens=False).ids) <= 5
+
+
+RULE_FIXTURES = (
+    'Plan: Comprehensive Shield. Premium: $1,450 per year. IDV: $520,000. '
+    'Includes Zero Depreciation and Roadside Assistance from Geico.',
+    'Liberty Mutual Gold Plan. The annual premium is $1,200.50 with a $500 deductible. '
+    'Claim settlement takes 7 days. Coverage extends to flood damage. Call us today.',
+    ' '.join(['Nothing to see here.'] * 25) + ' The premium is listed at the end.',
+    'Welcome to our site! We care about you. Contact support anytime.',
+    'PROGRESSIVE Basic Coverage: third party only. Insured Value: 300,000. '
+    'CLAIM approvals are quick? Engine Protection and NCB Protection cost extra! IDV applies.',
+    'premium premium premium. coverage. claim. deductible. idv. more premium.',
+    'İstanbul branch of Allstate. The premium is 900 yearly.',  # Lowercasing changes length
+)
+
+
+def python_fallback(monkeypatch):
+    """Disable the Hyperscan and Aho-Corasick scanners"""
+    monkeypatch.setattr(llm_extractor, 'RULE_SCANNER', None)
+    monkeypatch.setattr(llm_extractor, 'KEYWORD_AUTOMATON', None)
+
+
+@pytest.mark.parametrize('text', RULE_FIXTURES)
+def test_rule_extraction_matches_python_fallback(text, extractor, monkeypatch):
+    """Scanner-accelerated rule extraction equals the pure-Python path"""
+    accelerated = extractor._extract_with_rules(text, None)
+    python_fallback(monkeypatch)
+    assert extractor._extract_with_rules(text, None) == accelerated
+
+
+@pytest.mark.skipif(llm_extractor.KEYWORD_AUTOMATON is None, reason="pyahocorasick not installed")
+@pytest.mark.parametrize('text', RULE_FIXTURES)
+def test_keyword_automaton_matches_sentence_loop(text, extractor):
+    """Aho-Corasick hits give the same insurer, add-ons and evidence sentences"""
+    hits = llm_extractor.scan_keywords(text)
+    if hits is None:
+        pytest.skip("text falls back to the sentence loop")
+
+    assert extractor._evidence_from_hits(text, hits['evidence']) == extractor._extract_evidence(text)
+    assert extractor._extract_add_ons(text, hits) == extractor._extract_add_ons(text)
+    assert extractor._extract_insurer(text, hits) == extractor._extract_insurer(text)
+
+
+@pytest.mark.skipif(llm_extractor.RULE_SCANNER is None, reason="hyperscan not installed")
+@pytest.mark.parametrize('text', RULE_FIXTURES)
+def test_rule_scanner_matches_regex(text, extractor):
+    """Hyperscan prefiltering picks the same plan name, premium and IDV"""
+    matched = llm_extractor.scan_rule_patterns(text)
+
+    assert extractor._extract_plan_name(text, matched) == extractor._extract_plan_name(text)
+    assert extractor._extract_premium(text, matched) == extractor._extract_premium(text)
+    assert extractor._extract_idv(text, matched) == extractor._extract_idv(text)
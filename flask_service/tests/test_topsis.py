@@ -0,0 +1,29 @@
+"""
+TOPSIS kernel tests
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.topsis import NUMBA_MIN_PLANS, _column_norms, _topsis_njit, _topsis_score
+
+
+@pytest.mark.skipif(_topsis_njit is None, reason="numba not installed")
+@pytest.mark.parametrize('seed', range(5))
+def test_njit_kernel_matches_numpy(seed):
+    """The compiled kernel ranks large plan sets like the NumPy kernel"""
+    rng = np.random.default_rng(seed)
+    matrix = rng.uniform(0, 1, size=(NUMBA_MIN_PLANS * 4 + seed, 4))
+    weights = rng.dirichlet(np.ones(4))
+    norms = _column_norms(matrix)
+
+    expected = _topsis_score(matrix, weights, norms)
+    scores = _topsis_njit(matrix, weights, norms)
+
+    np.testing.assert_allclose(scores, expected, rtol=1e-9, atol=1e-12)
+    np.testing.assert_array_equal(np.argsort(-scores, kind='stable'), np.argsort(-expected, kind='stable'))
@@ -3,6 +3,7 @@ Utility functions package
 """
 
 from .data_loader import DataLoader
+from .json_provider import ORJSONProvider
 
-__all__ = ['DataLoader']
+__all__ = ['DataLoader', 'ORJSONProvider']
 
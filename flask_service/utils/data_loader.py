@@ -2,146 +2,454 @@
 Data loader utility for seeding database with initial insurance data
 """
 
-import json
 import logging
+import orjson
+import os
 from datetime import datetime
-from typing import List, Dict
-from bson import ObjectId
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Dict, Optional, Tuple, Union
+from bson import ObjectId, has_c
+from pymongo import ASCENDING, InsertOne, WriteConcern
+from pymongo.errors import BulkWriteError, InvalidOperation
+
+try:
+    import ijson
+except ImportError:  # Optional: streaming JSON parsing for large seed files
+    ijson = None
 
 logger = logging.getLogger(__name__)
 
+# Documents per bulk write; keeps each wire message well under the 16MB limit
+BATCH_SIZE = int(os.getenv('SEED_BATCH_SIZE', '1000'))
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+def iter_json_array(filepath: str) -> Iterator[Dict]:
+    """
+    Yield the items of a JSON file holding a top-level array
+    
+    With ijson installed items are parsed incrementally, so the whole file
+    is never held in memory; otherwise the file is parsed with orjson.
+    """
+    if ijson is not None:
+        with open(filepath, 'rb') as f:
+            yield from ijson.items(f, 'item', use_float=True)
+    else:
+        with open(filepath, 'rb') as f:
+            yield from orjson.loads(f.read())
+
+
+def vehicle_key(vehicle: Dict) -> Tuple:
+    """Key the unique vehicles index is built on"""
+    return (vehicle['make'], vehicle['model'], vehicle.get('variant'))
+
+
+def iter_batches(items: Iterable, size: int) -> Iterator[List]:
+    """Yield successive lists of up to size items"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
 
 class DataLoader:
     """Load seed data into MongoDB collections"""
     
-    def __init__(self, db):
+    def __init__(self, db, seed_mode: bool = False, batch_size: int = BATCH_SIZE):
+        """
+        Args:
+            db: Database handle
+            seed_mode: Relax write concern (no journal wait) for bulk seeding
+            batch_size: Default documents per bulk write
+        """
         self.db = db
+        self.seed_mode = seed_mode
+        self.batch_size = batch_size
+        self._client_bulk_write = True  # Cleared once the server rejects it
+        self._indexes_ensured = False
+        
+        if not has_c():
+            logger.warning("bson C extension not available; seed inserts will use the slow pure-Python encoder")
     
-    def load_insurers(self, insurers_data: List[Dict]) -> List[str]:
+    def ensure_indexes(self):
         """
-        Load insurers into database
+        Create indexes on the fields seeding looks documents up by
+        
+        Raises:
+            Exception: If a unique index cannot be created (e.g. the collection
+                already holds duplicates); load_insurers and load_vehicles rely
+                on those indexes to skip existing documents
+        """
+        indexes = [
+            ('insurers', [('name', ASCENDING)], {'unique': True}),
+            ('vehicles', [('make', ASCENDING), ('model', ASCENDING), ('variant', ASCENDING)], {'unique': True}),
+            ('plans', [('plan_id', ASCENDING)], {}),
+            ('signals', [('plan_id', ASCENDING)], {}),
+        ]
+        
+        for collection_name, keys, options in indexes:
+            try:
+                self.db.get_collection(collection_name).create_index(keys, **options)
+            except Exception as e:
+                if options.get('unique'):
+                    logger.error(f"Error creating unique index on {collection_name}: {e}")
+                    raise
+                logger.warning(f"Error creating index on {collection_name}: {e}")
+        
+        self._indexes_ensured = True
+    
+    def _bulk_insert(
+        self,
+        collection,
+        docs: List[Dict],
+        batch_size: Optional[int] = None,
+        duplicates: Optional[List[Dict]] = None
+    ) -> int:
+        """
+        Insert documents with unordered bulk writes, batch_size at a time
         
         Args:
-            insurers_data: List of insurer dictionaries
+            collection: Target collection
+            docs: Documents to insert ('_id' is assigned in place if missing)
+            batch_size: Documents per bulk_write call (defaults to self.batch_size)
+            duplicates: If given, documents rejected by a unique index are
+                appended here instead of raising BulkWriteError
         
         Returns:
-            List of inserted insurer IDs
+            Number of documents inserted
         """
-        collection = self.db.get_collection('insurers')
-        inserted_ids = []
+        if self.seed_mode:
+            collection = collection.with_options(write_concern=WriteConcern(w=1, j=False))
         
-        for insurer in insurers_data:
-            # Check if already exists
-            existing = collection.find_one({'name': insurer['name']})
-            if existing:
-                inserted_ids.append(str(existing['_id']))
-                logger.info(f"Insurer already exists: {insurer['name']}")
-                continue
+        batch_size = batch_size or self.batch_size
+        
+        for doc in docs:
+            doc.setdefault('_id', ObjectId())
+        
+        inserted = 0
+        for start in range(0, len(docs), batch_size):
+            batch = docs[start:start + batch_size]
+            try:
+                collection.bulk_write([InsertOne(doc) for doc in batch], ordered=False)
+                inserted += len(batch)
+            except BulkWriteError as e:
+                errors = e.details.get('writeErrors', [])
+                if duplicates is None or any(error['code'] != DUPLICATE_KEY_ERROR for error in errors):
+                    raise
+                # Unordered: every other document in the batch was written
+                inserted += e.details.get('nInserted', len(batch) - len(errors))
+                duplicates.extend(batch[error['index']] for error in errors)
+        
+        return inserted
+    
+    def _client_bulk_insert(self, batches: List[Tuple[Any, List[Dict]]]):
+        """
+        Insert into several collections with one client-level bulk_write
+        
+        Needs pymongo 4.9+ and MongoDB 8.0+; otherwise each collection gets
+        its own bulk write.
+        
+        Args:
+            batches: (collection, docs) pairs ('_id' is assigned in place if missing)
+        """
+        batches = [(collection, docs) for collection, docs in batches if docs]
+        if not batches:
+            return
+        
+        client = batches[0][0].database.client
+        # Checked on the class: older clients resolve unknown attributes to databases
+        if self._client_bulk_write and callable(getattr(type(client), 'bulk_write', None)):
+            for _, docs in batches:
+                for doc in docs:
+                    doc.setdefault('_id', ObjectId())
             
-            insurer['created_at'] = datetime.now()
-            result = collection.insert_one(insurer)
-            inserted_ids.append(str(result.inserted_id))
-            logger.info(f"Inserted insurer: {insurer['name']}")
+            try:
+                client.bulk_write(
+                    [
+                        InsertOne(doc, namespace=collection.full_name)
+                        for collection, docs in batches
+                        for doc in docs
+                    ],
+                    ordered=False,
+                    write_concern=WriteConcern(w=1, j=False) if self.seed_mode else None
+                )
+                return
+            except InvalidOperation as e:
+                # Raised before anything is written when the server is too old
+                logger.info(f"Client-level bulk_write unavailable, writing per collection: {e}")
+                self._client_bulk_write = False
         
-        return inserted_ids
+        for collection, docs in batches:
+            self._bulk_insert(collection, docs)
     
-    def load_plans(self, plans_data: List[Dict]) -> List[str]:
+    def _stream_insert(
+        self,
+        collection,
+        docs: Iterable[Dict],
+        return_ids: bool,
+        describe: Callable[[Dict], str]
+    ) -> Union[List[str], int]:
         """
-        Load insurance plans into database
+        Timestamp and insert documents one batch at a time
+        
+        Only a single batch of docs is held in memory, so a streamed source
+        overlaps parsing with the inserts.
         
         Args:
-            plans_data: List of plan dictionaries
+            collection: Target collection
+            docs: Documents to insert
+            return_ids: Return the ID list (otherwise just the count)
+            describe: Builds the per-document debug log line
         
         Returns:
-            List of inserted plan IDs
+            List of inserted IDs, or their count if return_ids is False
         """
-        collection = self.db.get_collection('plans')
+        count = 0
         inserted_ids = []
         
-        for plan in plans_data:
-            plan['created_at'] = datetime.now()
-            plan['updated_at'] = datetime.now()
+        for batch in iter_batches(docs, self.batch_size):
+            # One timestamp for the whole batch
+            now = datetime.utcnow()
+            for doc in batch:
+                doc['created_at'] = now
+                doc['updated_at'] = now
+            
+            count += self._bulk_insert(collection, batch)
+            logger.info(f"Bulk inserted {len(batch)} documents into {collection.name}")
+            if logger.isEnabledFor(logging.DEBUG):
+                for doc in batch:
+                    logger.debug(describe(doc))
             
-            result = collection.insert_one(plan)
-            inserted_ids.append(str(result.inserted_id))
-            logger.info(f"Inserted plan: {plan.get('plan_name', 'Unknown')}")
+            if return_ids:
+                inserted_ids.extend(str(doc['_id']) for doc in batch)
         
-        return inserted_ids
+        return inserted_ids if return_ids else count
     
-    def load_signals(self, signals_data: List[Dict]) -> List[str]:
+    def load_insurers(self, insurers_data: Iterable[Dict], return_ids: bool = True) -> Union[List[str], int]:
+        """
+        Load insurers into database
+        
+        Args:
+            insurers_data: Insurer dictionaries (any iterable)
+            return_ids: Return the ID list (otherwise just the count)
+        
+        Returns:
+            List of inserted insurer IDs, or their count if return_ids is False
+        """
+        if not self._indexes_ensured:
+            self.ensure_indexes()  # The unique name index rejects existing insurers
+        
+        collection = self.db.get_collection('insurers')
+        insurers_data = list(insurers_data)  # Small catalog; needed whole to map IDs back
+        by_name = {}
+        to_insert = []
+        
+        now = datetime.utcnow()
+        for insurer in insurers_data:
+            name = insurer['name']
+            if name not in by_name:
+                insurer['created_at'] = now
+                to_insert.append(insurer)
+                by_name[name] = insurer
+        
+        duplicates = []
+        inserted = self._bulk_insert(collection, to_insert, duplicates=duplicates)
+        
+        # Resolve insurers that already existed to their stored IDs in one query
+        if duplicates:
+            names = [insurer['name'] for insurer in duplicates]
+            for doc in collection.find({'name': {'$in': names}}, {'name': 1}):
+                by_name[doc['name']] = doc
+            if logger.isEnabledFor(logging.DEBUG):
+                for name in names:
+                    logger.debug(f"Insurer already exists: {name}")
+        logger.info(f"Bulk inserted {inserted} insurers ({len(insurers_data) - inserted} skipped as existing)")
+        
+        if not return_ids:
+            return len(insurers_data)
+        return [str(by_name[insurer['name']]['_id']) for insurer in insurers_data]
+    
+    def load_plans(self, plans_data: Iterable[Dict], return_ids: bool = True) -> Union[List[str], int]:
+        """
+        Load insurance plans into database
+        
+        Args:
+            plans_data: Plan dictionaries (any iterable; consumed in batches)
+            return_ids: Return the ID list (otherwise just the count)
+        
+        Returns:
+            List of inserted plan IDs, or their count if return_ids is False
+        """
+        collection = self.db.get_collection('plans')
+        return self._stream_insert(
+            collection, plans_data, return_ids,
+            lambda plan: f"Inserted plan: {plan.get('plan_name', 'Unknown')}"
+        )
+    
+    def load_signals(self, signals_data: Iterable[Dict], return_ids: bool = True) -> Union[List[str], int]:
         """
         Load service quality signals into database
         
         Args:
-            signals_data: List of signal dictionaries
+            signals_data: Signal dictionaries (any iterable; consumed in batches)
+            return_ids: Return the ID list (otherwise just the count)
         
         Returns:
-            List of inserted signal IDs
+            List of inserted signal IDs, or their count if return_ids is False
         """
         collection = self.db.get_collection('signals')
-        inserted_ids = []
+        return self._stream_insert(
+            collection, signals_data, return_ids,
+            lambda signal: f"Inserted signals for plan: {signal.get('plan_id')}"
+        )
+    
+    def load_plans_with_signals(
+        self,
+        plans_data: Iterable[Dict],
+        signals_data: Iterable[Dict]
+    ) -> Tuple[int, int]:
+        """
+        Load plans together with the signals that reference them
         
+        Plan '_id's are assigned client-side, so each batch of plans and its
+        signals (with plan_id rewritten to the stored plan '_id') go to the
+        server in one client-level bulk write.
+        
+        Args:
+            plans_data: Plan dictionaries (any iterable; consumed in batches)
+            signals_data: Signal dictionaries keyed to plans by seed 'plan_id'
+        
+        Returns:
+            Tuple of (plans inserted, signals inserted)
+        """
+        plans_collection = self.db.get_collection('plans')
+        signals_collection = self.db.get_collection('signals')
+        
+        signals_by_plan = {}
         for signal in signals_data:
-            signal['created_at'] = datetime.now()
-            signal['updated_at'] = datetime.now()
+            signals_by_plan.setdefault(signal.get('plan_id'), []).append(signal)
+        
+        plan_count = 0
+        signal_count = 0
+        for batch in iter_batches(plans_data, self.batch_size):
+            # One timestamp for the whole batch
+            now = datetime.utcnow()
+            batch_signals = []
+            for plan in batch:
+                plan['created_at'] = now
+                plan['updated_at'] = now
+                plan.setdefault('_id', ObjectId())
+                seed_plan_id = plan.get('plan_id')
+                if seed_plan_id is None:
+                    continue  # Signals without a plan_id must not attach to it
+                for signal in signals_by_plan.pop(seed_plan_id, ()):
+                    signal['plan_id'] = str(plan['_id'])
+                    signal['created_at'] = now
+                    signal['updated_at'] = now
+                    batch_signals.append(signal)
             
-            result = collection.insert_one(signal)
-            inserted_ids.append(str(result.inserted_id))
-            logger.info(f"Inserted signals for plan: {signal.get('plan_id')}")
+            self._client_bulk_insert([(plans_collection, batch), (signals_collection, batch_signals)])
+            logger.info(f"Bulk inserted {len(batch)} plans and {len(batch_signals)} signals")
+            plan_count += len(batch)
+            signal_count += len(batch_signals)
         
-        return inserted_ids
+        if signals_by_plan:
+            # Signals for plans loaded earlier are mapped through the database;
+            # any still unmatched are stored unchanged
+            stored_ids = {
+                plan['plan_id']: str(plan['_id'])
+                for plan in plans_collection.find(
+                    {'plan_id': {'$in': [key for key in signals_by_plan if key is not None]}},
+                    {'plan_id': 1, '_id': 1}
+                )
+            }
+            leftover = []
+            for seed_plan_id, signals in signals_by_plan.items():
+                for signal in signals:
+                    if seed_plan_id in stored_ids:
+                        signal['plan_id'] = stored_ids[seed_plan_id]
+                    leftover.append(signal)
+            
+            signal_count += self._stream_insert(
+                signals_collection, leftover, False,
+                lambda signal: f"Inserted signals for plan: {signal.get('plan_id')}"
+            )
+        
+        return plan_count, signal_count
     
-    def load_vehicles(self, vehicles_data: List[Dict]) -> List[str]:
+    def load_vehicles(self, vehicles_data: Iterable[Dict], return_ids: bool = True) -> Union[List[str], int]:
         """
         Load vehicle catalog into database
         
         Args:
-            vehicles_data: List of vehicle dictionaries
+            vehicles_data: Vehicle dictionaries (any iterable)
+            return_ids: Return the ID list (otherwise just the count)
         
         Returns:
-            List of inserted vehicle IDs
+            List of inserted vehicle IDs, or their count if return_ids is False
         """
+        if not self._indexes_ensured:
+            self.ensure_indexes()  # The unique (make, model, variant) index rejects existing vehicles
+        
         collection = self.db.get_collection('vehicles')
-        inserted_ids = []
+        vehicles_data = list(vehicles_data)  # Small catalog; needed whole to map IDs back
+        by_key = {}
+        to_insert = []
         
+        now = datetime.utcnow()
         for vehicle in vehicles_data:
-            # Check if already exists
-            existing = collection.find_one({
-                'make': vehicle['make'],
-                'model': vehicle['model'],
-                'variant': vehicle.get('variant')
-            })
-            if existing:
-                inserted_ids.append(str(existing['_id']))
-                continue
-            
-            vehicle['created_at'] = datetime.now()
-            result = collection.insert_one(vehicle)
-            inserted_ids.append(str(result.inserted_id))
-            logger.info(f"Inserted vehicle: {vehicle['make']} {vehicle['model']}")
+            key = vehicle_key(vehicle)
+            if key not in by_key:
+                vehicle['created_at'] = now
+                to_insert.append(vehicle)
+                by_key[key] = vehicle
+        
+        duplicates = []
+        inserted = self._bulk_insert(collection, to_insert, duplicates=duplicates)
+        
+        # Resolve vehicles that already existed in one query: fetch candidates
+        # by (make, model), then match the exact key client-side
+        if duplicates:
+            keys = {vehicle_key(vehicle) for vehicle in duplicates}
+            for doc in collection.find(
+                {
+                    'make': {'$in': list({key[0] for key in keys})},
+                    'model': {'$in': list({key[1] for key in keys})}
+                },
+                {'make': 1, 'model': 1, 'variant': 1}
+            ):
+                key = vehicle_key(doc)
+                if key in keys:
+                    by_key[key] = doc
+        logger.info(f"Bulk inserted {inserted} vehicles ({len(vehicles_data) - inserted} skipped as existing)")
         
-        return inserted_ids
+        if not return_ids:
+            return len(vehicles_data)
+        return [str(by_key[vehicle_key(vehicle)]['_id']) for vehicle in vehicles_data]
     
-    def load_from_json_file(self, filepath: str, collection_type: str):
+    def load_from_json_file(self, filepath: str, collection_type: str, return_ids: bool = True):
         """
         Load data from JSON file
         
         Args:
             filepath: Path to JSON file
             collection_type: Type of collection ('insurers', 'plans', 'signals', 'vehicles')
+            return_ids: Return the ID list (otherwise just the count)
         """
         try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
+            data = iter_json_array(filepath)
             
             if collection_type == 'insurers':
-                return self.load_insurers(data)
+                return self.load_insurers(data, return_ids=return_ids)
             elif collection_type == 'plans':
-                return self.load_plans(data)
+                return self.load_plans(data, return_ids=return_ids)
             elif collection_type == 'signals':
-                return self.load_signals(data)
+                return self.load_signals(data, return_ids=return_ids)
             elif collection_type == 'vehicles':
-                return self.load_vehicles(data)
+                return self.load_vehicles(data, return_ids=return_ids)
             else:
                 raise ValueError(f"Unknown collection type: {collection_type}")
                 
@@ -3,22 +3,25 @@
 Generate .env file with secure secret keys
 """
 
+import os
 import secrets
+import sys
 
-def generate_secret_key():
-    """Generate a secure random secret key"""
-    return secrets.token_hex(32)
+def generate_secret_keys(count):
+    """Generate secure random secret keys from a single randomness draw"""
+    raw = secrets.token_bytes(32 * count)
+    return [raw[i:i + 32].hex() for i in range(0, len(raw), 32)]
 
 def create_env_file():
     """Create .env file with generated keys"""
     
-    flask_secret = generate_secret_key()
-    django_secret = generate_secret_key()
-    jwt_secret = generate_secret_key()
+    flask_secret, django_secret, jwt_secret = generate_secret_keys(3)
     
     env_content = f"""# MongoDB Configuration
 MONGODB_URI=mongodb://localhost:27017/
 MONGODB_DB_NAME=insurance_recommender
+MONGODB_MAX_POOL_SIZE=100
+MONGODB_MIN_POOL_SIZE=0
 
 # Flask Configuration
 FLASK_SECRET_KEY={flask_secret}
@@ -45,18 +48,24 @@ JWT_SECRET_KEY={jwt_secret}
 # CACHE_ENABLED=False
 """
     
-    # Write to .env file
+    # Write to .env file in one call (owner-only, since it holds secrets)
     env_path = '../.env'
-    with open(env_path, 'w') as f:
-        f.write(env_content)
+    fd = os.open(env_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        os.write(fd, env_content.encode())
+    finally:
+        os.close(fd)
     
-    print("✅ .env file created successfully!")
-    print(f"📁 Location: {env_path}")
-    print("\n🔑 Generated Secret Keys:")
-    print(f"Flask:  {flask_secret[:20]}...")
-    print(f"Django: {django_secret[:20]}...")
-    print(f"JWT:    {jwt_secret[:20]}...")
-    print("\n⚠️  Keep these keys secret! Don't commit to Git.")
+    lines = [
+        "✅ .env file created successfully!",
+        f"📁 Location: {env_path}",
+        "\n🔑 Generated Secret Keys:",
+        f"Flask:  {flask_secret[:20]}...",
+        f"Django: {django_secret[:20]}...",
+        f"JWT:    {jwt_secret[:20]}...",
+        "\n⚠️  Keep these keys secret! Don't commit to Git.",
+    ]
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 if __name__ == '__main__':
     create_env_file()
\ No newline at end of file
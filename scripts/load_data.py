@@ -6,136 +6,198 @@ Run this after generating seed data with generate_seed_data.py
 
 import sys
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'flask_service'))
 
 from database import get_db, init_db
-from utils.data_loader import DataLoader
+from utils.data_loader import DataLoader, iter_json_array
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Client pool for seeding: enough connections to keep many bulk writes in
+# flight, and no journal wait on acknowledgement
+SEED_CLIENT_OPTIONS = {'maxPoolSize': 50, 'minPoolSize': 10, 'w': 1, 'journal': False}
+
+
+def load_file_worker(filepath: str, collection_type: str) -> int:
+    """Load one seed file in a worker process with its own MongoDB client"""
+    # MongoClient is not fork-safe, so each worker connects with its own pool
+    db = get_db(**SEED_CLIENT_OPTIONS)
+    try:
+        loader = DataLoader(db, seed_mode=True)
+        return loader.load_from_json_file(filepath, collection_type, return_ids=False)
+    finally:
+        db.close()
+
+
+def load_insurer_map(db) -> dict:
+    """Map insurer names to their _id"""
+    # Kept as ObjectId so plans store a typed reference that needs no
+    # conversion at query time
+    return {
+        ins['name']: ins['_id']
+        for ins in db.get_collection('insurers').find({}, {'name': 1, '_id': 1})
+    }
+
+
+def read_json_array(filepath: str) -> list:
+    """Parse a whole seed file (for background parsing)"""
+    return list(iter_json_array(filepath))
+
+
+def with_insurer_ids(plans, insurer_map: dict):
+    """Set each plan's insurer_id from its insurer_name as plans stream by"""
+    for plan in plans:
+        insurer_name = plan.get('insurer_name')
+        if insurer_name in insurer_map:
+            plan['insurer_id'] = insurer_map[insurer_name]
+        else:
+            logger.warning(f"Insurer not found: {insurer_name}")
+            plan['insurer_id'] = insurer_map.get('State Farm', '')  # Fallback
+        yield plan
+
+
+def write_lines(*lines):
+    """Write a block of output lines with a single stdout write"""
+    sys.stdout.write('\n'.join(lines) + '\n')
+    sys.stdout.flush()  # Step headers must show before the step's work starts
+
 
 def main():
     """Load all seed data into MongoDB"""
-    print("=" * 50)
-    print("Loading Seed Data into MongoDB")
-    print("=" * 50)
+    write_lines(
+        "=" * 50,
+        "Loading Seed Data into MongoDB",
+        "=" * 50
+    )
     
     # Initialize database
     try:
-        db = init_db()
+        db = init_db(**SEED_CLIENT_OPTIONS)
         logger.info("Database connection established")
     except Exception as e:
         logger.error(f"Failed to connect to database: {e}")
-        print("\n❌ Error: Could not connect to MongoDB")
-        print("Make sure MongoDB is running:")
-        print("  - macOS: brew services start mongodb-community")
-        print("  - Linux: sudo systemctl start mongod")
-        print("  - Or use MongoDB Atlas cloud connection")
+        write_lines(
+            "\n❌ Error: Could not connect to MongoDB",
+            "Make sure MongoDB is running:",
+            "  - macOS: brew services start mongodb-community",
+            "  - Linux: sudo systemctl start mongod",
+            "  - Or use MongoDB Atlas cloud connection"
+        )
         return 1
     
-    # Initialize data loader
-    loader = DataLoader(db)
+    # Initialize data loader (relaxed write concern for bulk seeding)
+    loader = DataLoader(db, seed_mode=True)
+    try:
+        loader.ensure_indexes()
+    except Exception as e:
+        write_lines(
+            f"\n❌ Error: Could not create unique seed indexes: {e}",
+            "Remove duplicate insurers/vehicles (or clear the collections) and rerun"
+        )
+        return 1
     
     # Data directory
     data_dir = Path(__file__).parent.parent / 'data'
     
     # Clear existing data (optional - uncomment if needed)
-    # print("\nClearing existing data...")
+    # write_lines("\nClearing existing data...")
     # loader.clear_collection('insurers')
     # loader.clear_collection('plans')
     # loader.clear_collection('signals')
     # loader.clear_collection('vehicles')
     
+    # Background threads for parsing and lookups that overlap with inserts
+    threads = ThreadPoolExecutor(max_workers=2)
+    
     try:
-        # Load insurers
-        print("\n1. Loading insurers...")
-        insurer_ids = loader.load_from_json_file(
-            str(data_dir / 'seed_insurers.json'),
-            'insurers'
+        # Load insurers and vehicles in parallel (they are independent)
+        write_lines("\n1-2. Loading insurers and vehicles...")
+        with ProcessPoolExecutor(
+            max_workers=2,
+            mp_context=multiprocessing.get_context('spawn')
+        ) as pool:
+            insurers_future = pool.submit(
+                load_file_worker,
+                str(data_dir / 'seed_insurers.json'),
+                'insurers'
+            )
+            vehicles_future = pool.submit(
+                load_file_worker,
+                str(data_dir / 'seed_vehicles.json'),
+                'vehicles'
+            )
+            insurer_count = insurers_future.result()
+            # Build the insurer map while vehicles finish loading
+            insurer_map_future = threads.submit(load_insurer_map, db)
+            vehicle_count = vehicles_future.result()
+        write_lines(
+            f"   ✓ Loaded {insurer_count} insurers",
+            f"   ✓ Loaded {vehicle_count} vehicles"
         )
-        print(f"   ✓ Loaded {len(insurer_ids)} insurers")
         
-        # Load vehicles
-        print("\n2. Loading vehicles...")
-        vehicle_ids = loader.load_from_json_file(
-            str(data_dir / 'seed_vehicles.json'),
-            'vehicles'
-        )
-        print(f"   ✓ Loaded {len(vehicle_ids)} vehicles")
+        # Load plans and signals (plans need insurer IDs, signals need plan IDs)
+        write_lines("\n3-4. Loading insurance plans and service quality signals...")
         
-        # Load plans (need to map insurer names to IDs)
-        print("\n3. Loading insurance plans...")
-        import json
-        with open(data_dir / 'seed_plans.json', 'r') as f:
-            plans_data = json.load(f)
+        # Parse signals in the background while the insurer map resolves
+        signals_future = threads.submit(
+            read_json_array,
+            str(data_dir / 'seed_signals.json')
+        )
         
         # Get insurer name to ID mapping
-        insurers_collection = db.get_collection('insurers')
-        insurer_map = {
-            ins['name']: str(ins['_id']) 
-            for ins in insurers_collection.find()
-        }
-        
-        # Map insurer names to IDs in plans
-        for plan in plans_data:
-            insurer_name = plan.get('insurer_name')
-            if insurer_name in insurer_map:
-                plan['insurer_id'] = insurer_map[insurer_name]
-            else:
-                logger.warning(f"Insurer not found: {insurer_name}")
-                plan['insurer_id'] = insurer_map.get('State Farm', '')  # Fallback
-        
-        plan_ids = loader.load_plans(plans_data)
-        print(f"   ✓ Loaded {len(plan_ids)} insurance plans")
-        
-        # Load signals (need to map plan_id to actual _id)
-        print("\n4. Loading service quality signals...")
-        with open(data_dir / 'seed_signals.json', 'r') as f:
-            signals_data = json.load(f)
-        
-        # Get plan_id to _id mapping
-        plans_collection = db.get_collection('plans')
-        plan_map = {
-            plan.get('plan_id', str(plan['_id'])): str(plan['_id'])
-            for plan in plans_collection.find()
-        }
+        insurer_map = insurer_map_future.result()
         
-        # Map plan_ids
-        for signal in signals_data:
-            old_plan_id = signal.get('plan_id')
-            if old_plan_id in plan_map:
-                signal['plan_id'] = plan_map[old_plan_id]
-        
-        signal_ids = loader.load_signals(signals_data)
-        print(f"   ✓ Loaded {len(signal_ids)} signal records")
+        # Stream plans from the file, mapping insurer names as they are read;
+        # each batch is written together with its signals
+        plans_data = with_insurer_ids(
+            iter_json_array(str(data_dir / 'seed_plans.json')),
+            insurer_map
+        )
+        plan_count, signal_count = loader.load_plans_with_signals(
+            plans_data,
+            signals_future.result()
+        )
+        write_lines(
+            f"   ✓ Loaded {plan_count} insurance plans",
+            f"   ✓ Loaded {signal_count} signal records"
+        )
         
         # Print summary
-        print("\n" + "=" * 50)
-        print("Data Loading Complete!")
-        print("=" * 50)
-        print(f"Insurers:  {len(insurer_ids)}")
-        print(f"Vehicles:  {len(vehicle_ids)}")
-        print(f"Plans:     {len(plan_ids)}")
-        print(f"Signals:   {len(signal_ids)}")
-        print("\nYou can now start the Flask and Django services.")
+        write_lines(
+            "\n" + "=" * 50,
+            "Data Loading Complete!",
+            "=" * 50,
+            f"Insurers:  {insurer_count}",
+            f"Vehicles:  {vehicle_count}",
+            f"Plans:     {plan_count}",
+            f"Signals:   {signal_count}",
+            "\nYou can now start the Flask and Django services."
+        )
         
         return 0
         
     except FileNotFoundError as e:
         logger.error(f"Data file not found: {e}")
-        print("\n❌ Error: Seed data files not found")
-        print("Run this first: cd data && python3 generate_seed_data.py")
+        write_lines(
+            "\n❌ Error: Seed data files not found",
+            "Run this first: cd data && python3 generate_seed_data.py"
+        )
         return 1
         
     except Exception as e:
         logger.error(f"Error loading data: {e}", exc_info=True)
-        print(f"\n❌ Error: {e}")
+        write_lines(f"\n❌ Error: {e}")
         return 1
+        
+    finally:
+        threads.shutdown(wait=False, cancel_futures=True)
 
 
 if __name__ == '__main__':
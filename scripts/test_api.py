@@ -3,25 +3,34 @@
 Test the Flask recommendation API
 """
 
+import os
 import requests
-import json
+from requests.adapters import HTTPAdapter
+import orjson
+
+BASE_URL = os.getenv('FLASK_SERVICE_URL', 'http://localhost:5000')
+
+# One kept-alive connection shared by all tests
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=10, pool_maxsize=10))
+SESSION.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=10))
 
 
 def test_health():
     """Test health endpoint"""
     print("Testing health endpoint...")
-    response = requests.get('http://localhost:5000/health')
+    response = SESSION.get(f'{BASE_URL}/health')
     print(f"Status: {response.status_code}")
-    print(json.dumps(response.json(), indent=2))
+    print(orjson.dumps(orjson.loads(response.content), option=orjson.OPT_INDENT_2).decode())
     print()
 
 
 def test_stats():
     """Test stats endpoint"""
     print("Testing stats endpoint...")
-    response = requests.get('http://localhost:5000/api/stats')
+    response = SESSION.get(f'{BASE_URL}/api/stats')
     print(f"Status: {response.status_code}")
-    print(json.dumps(response.json(), indent=2))
+    print(orjson.dumps(orjson.loads(response.content), option=orjson.OPT_INDENT_2).decode())
     print()
 
 
@@ -45,8 +54,8 @@ def test_recommend():
         }
     }
     
-    response = requests.post(
-        'http://localhost:5000/api/recommend',
+    response = SESSION.post(
+        f'{BASE_URL}/api/recommend',
         json=payload,
         headers={'Content-Type': 'application/json'}
     )
@@ -54,7 +63,7 @@ def test_recommend():
     print(f"Status: {response.status_code}")
     
     if response.status_code == 200:
-        data = response.json()
+        data = orjson.loads(response.content)
         print(f"Success: {data.get('success')}")
         print(f"Message: {data.get('message')}")
         print(f"\nRecommendations: {len(data.get('recommendations', []))}")
@@ -65,7 +74,7 @@ def test_recommend():
             print(f"  Premium: ${rec['premium_annual']:.2f}")
             print(f"  Rationale: {rec['rationale']}")
     else:
-        print(json.dumps(response.json(), indent=2))
+        print(orjson.dumps(orjson.loads(response.content), option=orjson.OPT_INDENT_2).decode())
     
     print()
 